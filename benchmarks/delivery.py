@@ -0,0 +1,55 @@
+"""
+Benchmark report delivery offline.
+
+Writes N report-sized files to a temporary folder and pushes them through
+a LocalDirectorySink with a simulated per-file latency, once per worker
+count, printing throughput and latency for each run.
+
+Usage:
+    python benchmarks/delivery.py
+    python benchmarks/delivery.py --files 500 --size-kb 800 --latency-ms 120 --workers 1 4 16
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tracker.sinks import LocalDirectorySink, push_batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark report delivery through a local sink")
+    parser.add_argument('--files', type=int, default=200, help="Files to push per run (default: 200)")
+    parser.add_argument('--size-kb', type=int, default=300, help="Size of each file in KiB (default: 300)")
+    parser.add_argument('--latency-ms', type=float, default=50.0, help="Simulated latency per push (default: 50)")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8], help="Worker counts to compare")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / "reports"
+        source.mkdir()
+        paths = []
+        for i in range(args.files):
+            path = source / f"report_{i:05d}.html"
+            path.write_bytes(os.urandom(args.size_kb * 1024))
+            paths.append(path)
+
+        print(f"[*] {args.files} files x {args.size_kb} KiB, {args.latency_ms:.0f} ms simulated latency")
+        print(f"    {'workers':>7}  {'files/s':>8}  {'MB/s':>7}  {'p50 ms':>7}  {'p95 ms':>7}  {'max ms':>7}")
+        for workers in args.workers:
+            sink = LocalDirectorySink(Path(tmp) / f"sink_{workers}", latency=args.latency_ms / 1000)
+            stats = push_batch(sink, paths, workers=workers).to_dict()
+            latency = stats['latency_ms']
+            print(f"    {workers:>7}  {stats['files_per_second']:>8.1f}  {stats['mb_per_second']:>7.1f}"
+                  f"  {latency['p50']:>7.1f}  {latency['p95']:>7.1f}  {latency['max']:>7.1f}")
+            if stats['failed']:
+                print(f"    [!] {stats['failed']} file(s) failed")
+
+
+if __name__ == "__main__":
+    main()
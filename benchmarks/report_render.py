@@ -0,0 +1,127 @@
+"""
+Benchmark HTML report rendering on a synthetic database.
+
+Fills a temporary database with N sessions (100k by default) spread over
+30 days, then times each stage of export_html: the streaming aggregation
+(uncached, and from the per-day aggregate cache), the daily-notes block,
+the template render and the full export.
+
+Usage:
+    python benchmarks/report_render.py
+    python benchmarks/report_render.py --sessions 250000 --runs 5
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tracker import db, export
+from tracker.utils import to_epoch_ms
+
+APPS = [
+    'chrome.exe', 'Code.exe', 'Discord.exe', 'Spotify.exe', 'explorer.exe', 'WindowsTerminal.exe',
+    'Figma.exe', 'Notion.exe', 'slack.exe', 'Obsidian.exe', 'steam.exe', 'pycharm64.exe',
+]
+
+
+def populate(count: int, days: int = 30, seed: int = 1):
+    """Insert `count` back-to-back sessions ending now."""
+    rng = random.Random(seed)
+    titles = {app: [f"{app} task {i} - some document title" for i in range(300)] for app in APPS}
+    at = datetime.now() - timedelta(days=days)
+    step = days * 86400 / count
+    rows = []
+    for _ in range(count):
+        app = rng.choice(APPS)
+        duration = max(1, int(rng.expovariate(1 / step)))
+        end = at + timedelta(seconds=duration)
+        rows.append((
+            app, rng.choice(titles[app]), rng.choice((1, 2)),
+            at.isoformat(sep=' '), end.isoformat(sep=' '), duration,
+            to_epoch_ms(at), to_epoch_ms(end),
+        ))
+        at = end
+    with db.get_db() as conn:
+        conn.executemany("""
+            INSERT INTO sessions (app_name, window_title, monitor, start_time, end_time, duration_seconds, start_ms, end_ms)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+
+
+def timed(func, runs: int) -> tuple[float, object]:
+    """Median wall time of `runs` calls in ms, and the last result."""
+    samples = []
+    result = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HTML report rendering")
+    parser.add_argument('--sessions', type=int, default=100_000, help="Sessions to generate (default: 100000)")
+    parser.add_argument('--runs', type=int, default=3, help="Runs per stage; the median is reported (default: 3)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATH = Path(tmp) / "bench.db"
+        export.EXPORTS_DIR = Path(tmp) / "exports"
+        db.init_db()
+
+        start = time.perf_counter()
+        populate(args.sessions)
+        print(f"[*] Generated {args.sessions:,} sessions in {time.perf_counter() - start:.1f}s")
+
+        start = time.perf_counter()
+        template = export.get_report_template()
+        print(f"    template load + compile  {(time.perf_counter() - start) * 1000:8.1f} ms (once per process)")
+
+        single_pass_ms, _ = timed(lambda: export._aggregate_range(None, None), args.runs)
+        aggregate_ms, aggregator = timed(export.aggregate_sessions, args.runs)
+        dailies_ms, dailies_html = timed(lambda: export.get_parsed_dailies_html(None, None), args.runs)
+        groups = aggregator.by_display_name()
+        context = {
+            'date_str': "All Time",
+            'export_time': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'dailies_html': dailies_html,
+            'total_seconds': aggregator.total_seconds,
+            'session_count': aggregator.session_count,
+            'monitors_used': len(aggregator.by_monitor()),
+            'monitor_totals': {m['monitor']: m['total_seconds'] for m in aggregator.by_monitor()},
+            'apps': [
+                {
+                    'id': f"app-group-{i}",
+                    'name': group['app_name'],
+                    'icon_url': export.get_app_icon_url(group['app_name']),
+                    'session_count': group['session_count'],
+                    'total_seconds': group['total_seconds'],
+                    'pct': group['total_seconds'] / groups[0]['total_seconds'] * 100,
+                    'titles': group['titles'],
+                }
+                for i, group in enumerate(groups)
+            ],
+            'top_sessions': aggregator.top_sessions(),
+        }
+        render_ms, html_content = timed(lambda: template.render(**context), args.runs)
+        export_ms, path = timed(export.export_html, args.runs)
+
+        print(f"    aggregate, single pass   {single_pass_ms:8.1f} ms")
+        print(f"    aggregate, day cache     {aggregate_ms:8.1f} ms (warm after the first run)")
+        print(f"    daily notes              {dailies_ms:8.1f} ms")
+        print(f"    template render          {render_ms:8.1f} ms ({len(html_content) / 1024:,.0f} KiB)")
+        print(f"    export_html end to end   {export_ms:8.1f} ms -> {path.name}")
+        db.close_connections()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Report what a cold start imports and how long each module takes.
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter
+(main by default), prints the total and the slowest modules by cumulative
+time, and exits with status 1 if a module that should load lazily (Google
+client, web server, dashboard, export/templates) was imported at startup.
+
+Usage:
+    python benchmarks/startup.py
+    python benchmarks/startup.py --module tracker.uploads --top 15
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+# Loaded on first upload, first export or once the dashboard starts, never at startup
+LAZY_MODULES = (
+    'googleapiclient', 'google.auth', 'google_auth_oauthlib', 'google_auth_httplib2', 'upload',
+    'uvicorn', 'fastapi', 'dashboard', 'jinja2', 'tracker.export', 'tracker.batch', 'webbrowser', 'asyncio',
+)
+
+# "import time:       212 |        345 |   tracker.db"
+_LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def import_times(module: str) -> tuple[list[dict], str]:
+    """Import `module` in a fresh interpreter; returns per-module timings and any error output."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    entries, errors = [], []
+    for line in proc.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append({
+                'name': name,
+                'self_ms': int(self_us) / 1000,
+                'cumulative_ms': int(cumulative_us) / 1000,
+                'depth': (len(indent) - 1) // 2,
+            })
+        elif not line.startswith("import time:"):
+            errors.append(line)
+    return entries, "\n".join(errors) if proc.returncode else ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show cold-start import times")
+    parser.add_argument('--module', default='main', help="Module to import (default: main)")
+    parser.add_argument('--top', type=int, default=10, help="Slowest modules to list (default: 10)")
+    args = parser.parse_args()
+
+    entries, error = import_times(args.module)
+    if error:
+        print(f"[!] import {args.module} failed:\n{error}")
+        sys.exit(2)
+
+    total_ms = sum(e['cumulative_ms'] for e in entries if e['depth'] == 0)
+    print(f"[*] import {args.module}: {len(entries)} modules, {total_ms:.1f} ms")
+    print(f"    {'cumulative':>10}  {'self':>8}  module")
+    for entry in sorted(entries, key=lambda e: e['cumulative_ms'], reverse=True)[:args.top]:
+        print(f"    {entry['cumulative_ms']:>8.1f}ms  {entry['self_ms']:>6.1f}ms  {entry['name']}")
+
+    eager = [
+        lazy for lazy in LAZY_MODULES
+        if any(e['name'] == lazy or e['name'].startswith(lazy + '.') for e in entries)
+    ]
+    if eager:
+        print(f"[!] Loaded at startup but should be lazy: {', '.join(eager)}")
+        sys.exit(1)
+    print("[+] No lazy-only modules loaded at startup")
+
+
+if __name__ == "__main__":
+    main()
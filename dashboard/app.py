@@ -1,14 +1,15 @@
 """FastAPI dashboard server with SSE for live updates."""
 
-import asyncio
 import json
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import AsyncGenerator
+from typing import Awaitable, Callable, Optional
 from pydantic import BaseModel
 import sqlite3
 from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse, StreamingResponse
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import HTMLResponse, Response, StreamingResponse
 from fastapi import HTTPException
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
@@ -16,12 +17,17 @@ from fastapi.templating import Jinja2Templates
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from tracker.db import get_db
+from tracker.db import get_db, get_read_db
 from tracker import db
 from tracker.monitor import get_monitor
+from tracker.uploads import get_upload_queue
 from tracker.utils import format_duration, format_duration_compact, sanitize_app_name
-from tracker.export import export_csv, export_json, export_html
+from tracker.export import export_json, export_html, stream_csv, stream_ndjson
 
+from dashboard.broadcast import BroadcastHub
+from dashboard.executor import run_io, iterate_io, io_executor, loop_lag
+from dashboard.cache import ResponseCache
+from dashboard.jobs import ExportJobManager, MEDIA_TYPES, DONE
 from main import record_daily_note
 
 # Paths
@@ -38,6 +44,12 @@ app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
 # Templates
 templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
 
+# Encoded read-endpoint responses, valid until the next committed write
+response_cache = ResponseCache()
+
+# Exports run here rather than inside the request
+export_jobs = ExportJobManager()
+
 class SessionLabelCreate(BaseModel):
     name: str
     color: str = "#5b8def"
@@ -49,6 +61,29 @@ class LabelEdit(BaseModel):
     name: str
     color: str
 
+class ExportJobCreate(BaseModel):
+    format: str # 'csv', 'json', or 'html'
+    start: Optional[str] = None
+    end: Optional[str] = None
+
+class ExportBatchCreate(BaseModel):
+    start: str
+    end: Optional[str] = None
+    period: str = "day" # 'day' or 'week'
+    formats: list[str] = ["html"]
+
+@app.on_event("startup")
+async def on_startup():
+    loop_lag.start()
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    loop_lag.stop()
+    export_jobs.shutdown()
+    io_executor.shutdown()
+
+
 @app.get("/", response_class=HTMLResponse)
 async def dashboard(request: Request):
     """Serve the main dashboard page."""
@@ -67,88 +102,222 @@ async def get_current_activity():
     return activity or {"status": "idle", "elapsed_seconds": 0, "elapsed_formatted": "00:00:00"}
 
 
+def _format_app_row(item: dict) -> dict:
+    """Add formatted duration and display name to a per-app summary row."""
+    item['duration_formatted'] = format_duration(item['total_seconds'])
+    item['app_display'] = sanitize_app_name(item['app_name'])
+    return item
+
+
+def _format_monitor_row(item: dict) -> dict:
+    """Add formatted duration to a per-monitor row."""
+    item['duration_formatted'] = format_duration(item['total_seconds'])
+    return item
+
+
+def _format_session(session: dict) -> dict:
+    """Add formatted duration, display name and start time to a session row."""
+    session['duration_formatted'] = format_duration(session['duration_seconds'] or 0)
+    session['app_display'] = sanitize_app_name(session['app_name'])
+    
+    # Format times
+    if session['start_time']:
+        st = datetime.fromisoformat(session['start_time'])
+        session['start_formatted'] = st.strftime("%H:%M:%S")
+    return session
+
+
+async def _cached_json(
+    request: Request,
+    compute: Callable[..., Awaitable],
+    *params,
+    live: Optional[Callable[[object], object]] = None
+) -> Response:
+    """
+    Serve compute(*params) as JSON, cached per (route, params, data generation).
+
+    `live`, if given, adds what must not be cached (the open session's
+    elapsed time grows every second) to a copy of the cached payload on each
+    request; the ETag then covers the final body. Answers a matching
+    If-None-Match with 304. X-Generated-At tells the client when the body
+    was computed, so it can extrapolate the open session's time from there.
+    """
+    # Read the generation first: a write landing mid-compute then only costs a recompute
+    key = (request.url.path, params, db.get_generation())
+    entry = response_cache.get(key)
+    if entry is None:
+        data = await compute(*params)
+        entry = response_cache.put(key, json.dumps(jsonable_encoder(data)).encode("utf-8"))
+    
+    body, etag, generated_at = entry.body, entry.etag, entry.generated_at
+    if live is not None:
+        body = json.dumps(jsonable_encoder(live(json.loads(body)))).encode("utf-8")
+        etag = ResponseCache.etag_for(body)
+        generated_at = int(time.time() * 1000)
+    
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "no-cache",
+        "X-Generated-At": str(generated_at),
+    }
+    if ResponseCache.matches(request.headers.get("if-none-match"), etag):
+        response_cache.not_modified += 1
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+def _add_open_session(rows: list[dict], key: str, session: dict, format_row: Callable[[dict], dict]):
+    """Fold the open session's elapsed time into its row (added if missing), as TodayModel totals do."""
+    row = next((r for r in rows if r[key] == session[key]), None)
+    if row is None:
+        row = {key: session[key], 'total_seconds': 0, 'session_count': 0}
+        rows.append(row)
+    row['total_seconds'] += session['elapsed_seconds']
+    row['session_count'] += 1
+    format_row(row)
+
+
 @app.get("/api/today")
-async def get_today_data():
+async def get_today_data(request: Request):
     """Get today's activity summary."""
-    summary = db.get_today_summary()
+    return await _cached_json(request, _today_payload, datetime.now().strftime("%Y-%m-%d"), live=_today_live)
+
+
+async def _today_payload(day: str) -> dict:
+    # Closed sessions only (cacheable until the next write); _today_live adds the open one
+    monitor = get_monitor()
+    summary = monitor.today.summary(include_open=False) if monitor.today.loaded else await run_io(db.get_today_summary)
     
     # Add formatted durations and display names
     for item in summary:
-        item['duration_formatted'] = format_duration(item['total_seconds'])
-        item['app_display'] = sanitize_app_name(item['app_name'])
+        _format_app_row(item)
     
     return {
+        "day": day,
         "summary": summary,
         "total_seconds": sum(item['total_seconds'] for item in summary),
         "total_formatted": format_duration_compact(sum(item['total_seconds'] for item in summary))
     }
 
 
+def _today_live(payload: dict) -> dict:
+    session = get_monitor().today.open_session()
+    if session and not session['is_idle'] and session['day'] == payload['day']:
+        summary = payload['summary']
+        _add_open_session(summary, 'app_name', session, _format_app_row)
+        summary.sort(key=lambda item: item['total_seconds'], reverse=True)
+        payload['total_seconds'] = sum(item['total_seconds'] for item in summary)
+        payload['total_formatted'] = format_duration_compact(payload['total_seconds'])
+    return payload
+
+
 @app.get("/api/monitors")
-async def get_monitor_data():
+async def get_monitor_data(request: Request):
     """Get monitor breakdown data."""
-    breakdown = db.get_monitor_breakdown()
+    day = datetime.now().strftime("%Y-%m-%d")
+    return await _cached_json(request, _monitors_payload, day, live=lambda rows: _monitors_live(rows, day))
+
+
+async def _monitors_payload(day: str) -> list[dict]:
+    # `day` only keys the cache so the breakdown resets at midnight; _monitors_live adds the open session
+    monitor = get_monitor()
+    breakdown = monitor.today.monitor_breakdown(include_open=False) if monitor.today.loaded else await run_io(db.get_monitor_breakdown)
     
     for item in breakdown:
-        item['duration_formatted'] = format_duration(item['total_seconds'])
+        _format_monitor_row(item)
     
     return breakdown
 
 
+def _monitors_live(breakdown: list[dict], day: str) -> list[dict]:
+    session = get_monitor().today.open_session()
+    if session and not session['is_idle'] and session['monitor'] > 0 and session['day'] == day:
+        _add_open_session(breakdown, 'monitor', session, _format_monitor_row)
+        breakdown.sort(key=lambda item: item['monitor'])
+    return breakdown
+
+
 @app.get("/api/sessions")
-async def get_recent_sessions(limit: int = 20):
+async def get_recent_sessions(request: Request, limit: int = 20):
     """Get recent activity sessions."""
-    sessions = db.get_recent_sessions(limit)
+    return await _cached_json(request, _sessions_payload, limit)
+
+
+async def _sessions_payload(limit: int) -> list[dict]:
+    today = get_monitor().today
+    if today.loaded and limit <= today.recent_limit:
+        sessions = today.recent_sessions(limit)
+    else:
+        sessions = await run_io(db.get_recent_sessions, limit)
     
     for session in sessions:
-        session['duration_formatted'] = format_duration(session['duration_seconds'] or 0)
-        session['app_display'] = sanitize_app_name(session['app_name'])
-        
-        # Format times
-        if session['start_time']:
-            st = datetime.fromisoformat(session['start_time'])
-            session['start_formatted'] = st.strftime("%H:%M:%S")
+        _format_session(session)
     
     return sessions
 
 
+@app.get("/api/diagnostics")
+async def get_diagnostics():
+    """Tracker performance counters (process cache hit rate, writer batches, ...)."""
+    diagnostics = get_monitor().get_diagnostics()
+    diagnostics['stream'] = stream_hub.stats()
+    diagnostics['io_executor'] = io_executor.stats()
+    diagnostics['response_cache'] = response_cache.stats()
+    diagnostics['export_jobs'] = export_jobs.stats()
+    diagnostics['loop_lag'] = loop_lag.stats()
+    diagnostics['uploads'] = get_upload_queue().stats()
+    return diagnostics
+
+
+def _activity_snapshot() -> dict:
+    """Current activity payload for the live stream."""
+    activity = get_monitor().get_current_activity()
+    
+    if activity:
+        activity['elapsed_formatted'] = format_duration(activity.get('elapsed_seconds', 0))
+        return activity
+    
+    return {
+        "status": "idle", 
+        "elapsed_seconds": 0, 
+        "elapsed_formatted": "00:00:00"
+    }
+
+
+# One producer builds each snapshot; every /api/stream client shares it
+stream_hub = BroadcastHub(_activity_snapshot)
+
+
+def _on_monitor_event(event: str, data: dict):
+    """Format a tracker event (on the monitor thread) and push it to stream clients."""
+    if event in ('session_started', 'session_ended'):
+        data = _format_session(dict(data))
+    elif event == 'totals_changed':
+        data = {
+            'day': data['day'],
+            'apps': [_format_app_row(item) for item in data['apps']],
+            'monitors': [_format_monitor_row(item) for item in data['monitors']],
+        }
+    stream_hub.publish(event, data)
+
+
+get_monitor().add_event_listener(_on_monitor_event)
+
+
+def _publish_label(label_id: int):
+    """Push the current row of one session label to stream clients."""
+    with get_read_db() as conn:
+        conn.row_factory = sqlite3.Row
+        row = conn.execute("SELECT * FROM session_labels WHERE id = ?", (label_id,)).fetchone()
+    if row:
+        stream_hub.publish('label_upserted', {'label': dict(row)})
+
+
 @app.get("/api/stream")
 async def stream_updates():
     """Server-Sent Events stream for live updates."""
-    
-    async def event_generator() -> AsyncGenerator[str, None]:
-        monitor = get_monitor()
-        
-        while True:
-            try:
-                # Get current activity
-                activity = monitor.get_current_activity()
-                
-                if activity:
-                    raw_seconds = activity.get('elapsed_seconds', 0)
-                    
-                    activity['elapsed_seconds'] = raw_seconds
-                    activity['elapsed_formatted'] = format_duration(raw_seconds)
-                    
-                    data = json.dumps(activity)
-                else:
-                    data = json.dumps({
-                        "status": "idle", 
-                        "elapsed_seconds": 0, 
-                        "elapsed_formatted": "00:00:00"
-                    })
-                
-                yield f"data: {data}\n\n"
-                
-                await asyncio.sleep(1)
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                print(f"SSE Error: {repr(e)}") 
-                await asyncio.sleep(1)
-    
     return StreamingResponse(
-        event_generator(),
+        stream_hub.stream(),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -158,6 +327,21 @@ async def stream_updates():
     )
 
 
+def _stream_export(blocks, extension: str, media_type: str) -> StreamingResponse:
+    """Send an export generator as a download, encoding one block at a time."""
+    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    
+    async def body():
+        async for block in iterate_io(blocks):
+            yield block.encode("utf-8")
+    
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="sessions_{timestamp}.{extension}"'}
+    )
+
+
 @app.get("/api/export/{format_type}")
 async def export_data(
     format_type: str, 
@@ -167,8 +351,11 @@ async def export_data(
     """
     Export activity data in various formats.
     
+    CSV and NDJSON are streamed straight from the database cursor, so the
+    first bytes go out immediately and no temp file is written.
+    
     Args:
-        format_type: 'csv', 'json', or 'html'
+        format_type: 'csv', 'ndjson', 'json', or 'html'
         start: Start date filter (YYYY-MM-DD), inclusive
         end: End date filter (YYYY-MM-DD), inclusive. Defaults to start if not provided.
     """
@@ -180,48 +367,116 @@ async def export_data(
     
     try:
         if format_type == "csv":
-            filepath = export_csv(start, end)
-            return FileResponse(
-                path=str(filepath),
-                filename=filepath.name,
-                media_type="text/csv"
-            )
+            return _stream_export(stream_csv(start, end), "csv", "text/csv")
+        elif format_type == "ndjson":
+            return _stream_export(stream_ndjson(start, end), "ndjson", "application/x-ndjson")
         elif format_type == "json":
-            filepath = export_json(start, end)
+            filepath = await run_io(export_json, start, end)
             return FileResponse(
                 path=str(filepath),
                 filename=filepath.name,
                 media_type="application/json"
             )
         elif format_type == "html":
-            filepath = export_html(start, end)
+            filepath = await run_io(export_html, start, end)
             return FileResponse(
                 path=str(filepath),
                 filename=filepath.name,
                 media_type="text/html"
             )
         else:
-            return {"error": f"Unknown format: {format_type}. Use 'csv', 'json', or 'html'."}
+            return {"error": f"Unknown format: {format_type}. Use 'csv', 'ndjson', 'json', or 'html'."}
     except Exception as e:
         return {"error": str(e)}
 
-@app.get("/api/session-labels")
-async def get_session_labels():
-    """Fetch all available task session labels."""
-    with get_db() as conn:
+def _fetch_session_labels() -> list[dict]:
+    with get_read_db() as conn:
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM session_labels ORDER BY created_at DESC")
         return [dict(row) for row in cursor.fetchall()]
 
-@app.post("/api/session-labels")
-async def create_session_label(session_label: SessionLabelCreate):
-    """Create a new project session label."""
+@app.post("/api/export-jobs", status_code=202)
+async def create_export_job(payload: ExportJobCreate):
+    """Start an export in the background (or join an identical one in flight)."""
+    try:
+        job = export_jobs.submit(payload.format, payload.start, payload.end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return job.to_dict()
+
+
+@app.post("/api/export-batch", status_code=202)
+async def create_export_batch(payload: ExportBatchCreate):
+    """
+    Start a batch export: one report per day or week of the range, rendered in
+    a process pool and bundled as a zip. Poll /api/export-jobs/{id} for
+    progress; once done its `result` holds per-report and per-worker timings.
+    """
+    try:
+        job = export_jobs.submit_batch(payload.start, payload.end, payload.period, payload.formats)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return job.to_dict()
+
+
+def _get_export_job(job_id: str):
+    job = export_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    return job
+
+
+@app.get("/api/export-jobs/{job_id}")
+async def get_export_job(job_id: str):
+    """Report an export job's status and progress."""
+    return _get_export_job(job_id).to_dict()
+
+
+@app.get("/api/export-jobs/{job_id}/result")
+async def get_export_job_result(job_id: str):
+    """Download the file produced by a finished export job."""
+    from fastapi.responses import FileResponse
+    
+    job = _get_export_job(job_id)
+    if job.status != DONE:
+        raise HTTPException(status_code=409, detail=f"Export job is {job.status}")
+    return FileResponse(
+        path=str(job.path),
+        filename=job.path.name,
+        media_type=MEDIA_TYPES[job.format]
+    )
+
+
+@app.delete("/api/export-jobs/{job_id}")
+async def cancel_export_job(job_id: str):
+    """Cancel a queued or running export job."""
+    _get_export_job(job_id)
+    return export_jobs.cancel(job_id).to_dict()
+
+@app.get("/api/session-labels")
+async def get_session_labels(request: Request):
+    """Fetch all available task session labels."""
+    return await _cached_json(request, _labels_payload)
+
+
+async def _labels_payload() -> list[dict]:
+    return await run_io(_fetch_session_labels)
+
+def _create_session_label(name: str, color: str) -> int:
     with get_db() as conn:
         cursor = conn.cursor()
         cursor.execute("INSERT INTO session_labels (name, color) VALUES (?, ?)", 
-                      (session_label.name, session_label.color))
-        return {"id": cursor.lastrowid}
+                      (name, color))
+        label_id = cursor.lastrowid
+    _publish_label(label_id)
+    return label_id
+
+@app.post("/api/session-labels")
+async def create_session_label(session_label: SessionLabelCreate):
+    """Create a new project session label."""
+    label_id = await run_io(_create_session_label, session_label.name, session_label.color)
+    return {"id": label_id}
 
 @app.post("/api/monitor/set-session-label/{session_label_id}")
 async def set_monitor_session_label(session_label_id: int):
@@ -231,26 +486,31 @@ async def set_monitor_session_label(session_label_id: int):
     get_monitor().set_active_session_label(actual_id)
     return {"status": "success", "active_session_label_id": actual_id}
 
+def _set_label_status(label_id: int, status: str):
+    """Update a label's status and append it to the dailies file."""
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT name FROM session_labels WHERE id = ?", (label_id,))
+        row = cursor.fetchone()
+        print(row)
+        if not row:
+            raise HTTPException(status_code=404, detail="Label not found")
+        
+        label_name = row[0]
+
+        cursor.execute("UPDATE session_labels SET status = ? WHERE id = ?", 
+                      (status, label_id))
+        conn.commit()
+    _publish_label(label_id)
+
+    log_message = f"Task: {label_name}"
+    record_daily_note(status, log_message)
+
 @app.put("/api/session-labels/{label_id}/status")
 async def update_label_status(label_id: int, payload: StatusUpdate):
     """Updates a label's status and logs it to the Dailies markdown file."""
     try:
-        with get_db() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT name FROM session_labels WHERE id = ?", (label_id,))
-            row = cursor.fetchone()
-            print(row)
-            if not row:
-                raise HTTPException(status_code=404, detail="Label not found")
-            
-            label_name = row[0]
-
-            cursor.execute("UPDATE session_labels SET status = ? WHERE id = ?", 
-                          (payload.status, label_id))
-            conn.commit()
-
-        log_message = f"Task: {label_name}"
-        record_daily_note(payload.status, log_message)
+        await run_io(_set_label_status, label_id, payload.status)
 
         # If you mark the currently active task as 'done', reset the monitor to 'General'
         monitor = get_monitor()
@@ -263,20 +523,30 @@ async def update_label_status(label_id: int, payload: StatusUpdate):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _edit_label(label_id: int, name: str, color: str):
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("UPDATE session_labels SET name = ?, color = ? WHERE id = ?", 
+                      (name, color, label_id))
+        conn.commit()
+    _publish_label(label_id)
+
 @app.put("/api/session-labels/{label_id}")
 async def edit_label(label_id: int, payload: LabelEdit):
     print("hrtht",payload)
     """Edits a task's name and color."""
     try:
-        with get_db() as conn:
-            cursor = conn.cursor()
-            cursor.execute("UPDATE session_labels SET name = ?, color = ? WHERE id = ?", 
-                          (payload.name, payload.color, label_id))
-            conn.commit()
+        await run_io(_edit_label, label_id, payload.name, payload.color)
         return {"status": "success", "message": "Label updated."}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _delete_label(label_id: int):
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM session_labels WHERE id = ?", (label_id,))
+        conn.commit()
+
 @app.delete("/api/session-labels/{label_id}")
 async def delete_label(label_id: int):
     """Deletes a task and resets the monitor if it was active."""
@@ -284,12 +554,10 @@ async def delete_label(label_id: int):
         # Safety Check: If we are deleting the active task, reset monitor to General
         monitor = get_monitor()
         if monitor.current_session_label_id == label_id:
-            monitor.set_active_label(None)
+            monitor.set_active_session_label(None)
 
-        with get_db() as conn:
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM session_labels WHERE id = ?", (label_id,))
-            conn.commit()
+        await run_io(_delete_label, label_id)
+        stream_hub.publish('label_deleted', {'id': label_id})
             
         return {"status": "success", "message": "Label deleted."}
     except Exception as e:
@@ -0,0 +1,137 @@
+"""Single-producer Server-Sent Events hub shared by every /api/stream client."""
+
+import asyncio
+import json
+import time
+from typing import Callable, Optional
+
+# Fields that change every second; clients extrapolate them locally
+VOLATILE_FIELDS = ('elapsed_seconds', 'elapsed_formatted', 'idle_duration_formatted')
+
+HEARTBEAT_COMMENT = b": keep-alive\n\n"
+
+
+def encode_event(data: dict, event: Optional[str] = None) -> bytes:
+    """Encode one SSE message."""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n".encode("utf-8")
+
+
+class BroadcastHub:
+    """
+    Builds the live-activity snapshot once per tick and fans the encoded bytes out.
+
+    Each subscriber gets a bounded queue. A client that falls `queue_size`
+    messages behind is dropped; its EventSource reconnects on its own. A new
+    event is only emitted when the snapshot changed, ignoring the per-second
+    elapsed counters. Comment heartbeats keep idle connections open between
+    events.
+    """
+
+    def __init__(self, snapshot: Callable[[], dict], interval: float = 1.0,
+                 heartbeat_interval: float = 15.0, queue_size: int = 16):
+        self.snapshot = snapshot
+        self.interval = interval
+        self.heartbeat_interval = heartbeat_interval
+        self.queue_size = queue_size
+        self._subscribers: set[asyncio.Queue] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._last_key: Optional[str] = None
+        self._last_sent = 0.0
+        # Counters for stats()
+        self.events_sent = 0
+        self.heartbeats_sent = 0
+        self.dropped_clients = 0
+        self.pushed_events = 0
+
+    def subscribe(self) -> asyncio.Queue:
+        """Register a client; it immediately receives the latest snapshot."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        # Fresh snapshot so the client's elapsed counters start from now
+        queue.put_nowait(encode_event(self.snapshot()))
+        self._subscribers.add(queue)
+        self._loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    def broadcast(self, payload: bytes):
+        """Fan pre-encoded bytes out to every subscriber, dropping slow consumers."""
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                self._drop(queue)
+        self._last_sent = time.monotonic()
+
+    def publish(self, event: str, data: dict):
+        """
+        Send a typed event to every subscriber. Safe to call from any thread.
+
+        Events published while nobody is connected are discarded; a client
+        that connects later loads the current state over the REST endpoints.
+        """
+        loop = self._loop
+        if loop is None or not self._subscribers or loop.is_closed():
+            return
+        payload = encode_event(data, event=event)
+        loop.call_soon_threadsafe(self._publish, payload)
+
+    def _publish(self, payload: bytes):
+        self.broadcast(payload)
+        self.pushed_events += 1
+
+    def _drop(self, queue: asyncio.Queue):
+        """Disconnect a client that stopped reading."""
+        self._subscribers.discard(queue)
+        self.dropped_clients += 1
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)  # Sentinel: end that client's stream
+
+    def _tick(self):
+        """Build the snapshot once and broadcast it if it changed."""
+        data = self.snapshot()
+        key = json.dumps({k: v for k, v in data.items() if k not in VOLATILE_FIELDS}, sort_keys=True)
+        if key != self._last_key:
+            self._last_key = key
+            self.broadcast(encode_event(data))
+            self.events_sent += 1
+        elif time.monotonic() - self._last_sent >= self.heartbeat_interval:
+            self.broadcast(HEARTBEAT_COMMENT)
+            self.heartbeats_sent += 1
+
+    async def _run(self):
+        """Producer loop; exits when the last subscriber leaves."""
+        while self._subscribers:
+            try:
+                self._tick()
+            except Exception as e:
+                print(f"SSE Error: {repr(e)}")
+            await asyncio.sleep(self.interval)
+        self._last_key = None
+
+    async def stream(self):
+        """Async generator of encoded SSE messages for one client."""
+        queue = self.subscribe()
+        try:
+            while True:
+                payload = await queue.get()
+                if payload is None:
+                    break
+                yield payload
+        finally:
+            self.unsubscribe(queue)
+
+    def stats(self) -> dict:
+        return {
+            'subscribers': len(self._subscribers),
+            'events_sent': self.events_sent,
+            'heartbeats_sent': self.heartbeats_sent,
+            'dropped_clients': self.dropped_clients,
+            'pushed_events': self.pushed_events,
+        }
@@ -0,0 +1,82 @@
+"""ETag response cache for the dashboard's read endpoints."""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Hashable, Optional
+
+
+@dataclass
+class CachedResponse:
+    """Encoded body of one read endpoint for one data generation."""
+    body: bytes
+    etag: str
+    generated_at: int  # Epoch ms when the body was computed
+
+
+class ResponseCache:
+    """
+    Small LRU of encoded JSON responses keyed by (route, params, generation).
+
+    The generation comes from tracker.db and changes on every committed
+    write, so an entry never needs explicit invalidation: once the data
+    changes, lookups use a new key and old entries age out of the LRU.
+    """
+
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, CachedResponse] = OrderedDict()
+        self._lock = threading.Lock()
+        # Counters for stats()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: Hashable, body: bytes) -> CachedResponse:
+        """Store an encoded body and return its entry with a strong ETag."""
+        entry = CachedResponse(
+            body=body,
+            etag=self.etag_for(body),
+            generated_at=int(time.time() * 1000),
+        )
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    @staticmethod
+    def etag_for(body: bytes) -> str:
+        """Strong ETag for an encoded body."""
+        return f'"{hashlib.sha1(body).hexdigest()}"'
+
+    @staticmethod
+    def matches(if_none_match: Optional[str], etag: str) -> bool:
+        """Whether an If-None-Match header value covers this ETag."""
+        if not if_none_match:
+            return False
+        tags = [tag.strip() for tag in if_none_match.split(',')]
+        return '*' in tags or etag in tags
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'not_modified': self.not_modified,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+        }
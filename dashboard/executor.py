@@ -0,0 +1,134 @@
+"""Bounded thread pool for the dashboard's blocking SQLite and file work, plus a loop-lag probe."""
+
+import asyncio
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Iterator, Optional
+
+# Threads doing database/file work for request handlers
+IO_WORKERS = 4
+# Calls allowed to wait for a thread before new callers are held back on the loop
+IO_MAX_PENDING = 64
+
+
+class IOExecutor:
+    """
+    Runs blocking calls on a fixed pool of worker threads.
+
+    Handlers `await run_io(func, ...)` instead of calling tracker.db or
+    writing files directly, so the event loop (and with it the SSE stream)
+    keeps running while an export or a slow query is in progress. A
+    semaphore caps submitted-but-unfinished calls so a burst of requests
+    queues on the loop instead of growing the executor's queue without bound.
+    """
+
+    def __init__(self, workers: int = IO_WORKERS, max_pending: int = IO_MAX_PENDING):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="workshot-io")
+        self._slots: Optional[asyncio.Semaphore] = None
+        # Counters for stats()
+        self.calls = 0
+        self.in_flight = 0
+        self._busy_total = 0.0
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Run func(*args, **kwargs) on the pool and await its result."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        async with self._slots:
+            self.in_flight += 1
+            start = time.perf_counter()
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._pool, functools.partial(func, *args, **kwargs))
+            finally:
+                self.in_flight -= 1
+                self.calls += 1
+                self._busy_total += time.perf_counter() - start
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True)
+
+    def stats(self) -> dict:
+        return {
+            'workers': self.workers,
+            'calls': self.calls,
+            'in_flight': self.in_flight,
+            'avg_call_ms': round(self._busy_total / self.calls * 1000, 2) if self.calls else 0.0,
+        }
+
+
+class LoopLagMonitor:
+    """
+    Measures how late the event loop wakes a sleeping task.
+
+    Every `interval` seconds a task sleeps and records how much longer than
+    requested the wakeup took. On a loop that nothing blocks the lag stays
+    near zero; a synchronous call in a handler shows up directly as lag.
+    """
+
+    def __init__(self, interval: float = 0.5, slow_threshold: float = 0.1):
+        self.interval = interval
+        self.slow_threshold = slow_threshold
+        self._task: Optional[asyncio.Task] = None
+        self.samples = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.slow_ticks = 0
+        self._lag_total = 0.0
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - start - self.interval)
+            self.samples += 1
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            self._lag_total += lag
+            if lag >= self.slow_threshold:
+                self.slow_ticks += 1
+
+    def stats(self) -> dict:
+        return {
+            'last_ms': round(self.last_lag * 1000, 2),
+            'avg_ms': round(self._lag_total / self.samples * 1000, 2) if self.samples else 0.0,
+            'max_ms': round(self.max_lag * 1000, 2),
+            'slow_ticks': self.slow_ticks,
+            'samples': self.samples,
+        }
+
+
+io_executor = IOExecutor()
+loop_lag = LoopLagMonitor()
+
+
+async def run_io(func: Callable, *args, **kwargs) -> Any:
+    """Await a blocking database or file call on the shared I/O pool."""
+    return await io_executor.run(func, *args, **kwargs)
+
+
+async def iterate_io(iterator: Iterator) -> AsyncIterator:
+    """Drive a blocking iterator (e.g. a cursor-backed export stream) on the I/O pool."""
+    done = object()
+    try:
+        while True:
+            item = await run_io(next, iterator, done)
+            if item is done:
+                break
+            yield item
+    finally:
+        close = getattr(iterator, 'close', None)
+        if close:
+            await run_io(close)
@@ -0,0 +1,188 @@
+"""Background export jobs with progress reporting and cancellation."""
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from tracker.batch import export_batch, split_range
+from tracker.export import EXPORTERS, ExportCancelled
+
+# Job states
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+MEDIA_TYPES = {
+    'csv': 'text/csv',
+    'json': 'application/json',
+    'html': 'text/html',
+    'ndjson': 'application/x-ndjson',
+    'batch': 'application/zip',
+}
+
+
+@dataclass
+class ExportJob:
+    """One export request and its progress."""
+    id: str
+    format: str
+    start: Optional[str]
+    end: Optional[str]
+    status: str = QUEUED
+    progress: float = 0.0
+    stage: str = QUEUED
+    path: Optional[Path] = None
+    error: Optional[str] = None
+    options: dict = field(default_factory=dict)   # Batch jobs: period and formats
+    result: Optional[dict] = None                 # Batch jobs: BatchResult.to_dict()
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    _cancel: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def key(self) -> tuple:
+        return (self.format, self.start, self.end, tuple(sorted(self.options.items())))
+
+    @property
+    def active(self) -> bool:
+        return self.status in (QUEUED, RUNNING)
+
+    def to_dict(self) -> dict:
+        return {
+            'id': self.id,
+            'format': self.format,
+            'start': self.start,
+            'end': self.end,
+            'status': self.status,
+            'progress': round(self.progress, 3),
+            'stage': self.stage,
+            'filename': self.path.name if self.path else None,
+            'error': self.error,
+            'options': self.options,
+            'result': self.result,
+            'created_at': self.created_at,
+            'finished_at': self.finished_at,
+        }
+
+
+class ExportJobManager:
+    """
+    Runs exports on a small worker pool, off the request path.
+
+    Submitting the same (format, start, end) while an identical job is still
+    queued or running returns that job instead of starting another. The
+    exporter's progress callback updates the job and raises ExportCancelled
+    once a cancel was requested, so cancellation takes effect at the next
+    progress checkpoint. Finished jobs are kept (most recent `keep_finished`)
+    so their results can still be fetched.
+    """
+
+    def __init__(self, workers: int = 2, keep_finished: int = 50):
+        self.keep_finished = keep_finished
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="workshot-export")
+        self._jobs: dict[str, ExportJob] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, format_type: str, start: Optional[str] = None, end: Optional[str] = None) -> ExportJob:
+        """Queue an export, or return the identical job already in flight."""
+        if format_type not in EXPORTERS:
+            raise ValueError(f"Unknown format: {format_type}. Use 'csv', 'json', 'ndjson', or 'html'.")
+        # If only start is provided, use it for both (single day export)
+        if start and not end:
+            end = start
+
+        return self._submit(ExportJob(id=uuid.uuid4().hex, format=format_type, start=start, end=end))
+
+    def submit_batch(self, start: str, end: Optional[str], period: str, formats: list[str]) -> ExportJob:
+        """Queue a batch export (a zip of per-day or per-week reports, see tracker.batch)."""
+        if not formats:
+            raise ValueError("Pick at least one format")
+        for format_type in formats:
+            if format_type not in EXPORTERS:
+                raise ValueError(f"Unknown format: {format_type}. Use 'csv', 'json', 'ndjson', or 'html'.")
+        split_range(start, end or start, period)  # Raises ValueError for a bad range or period
+        options = {'period': period, 'formats': tuple(dict.fromkeys(formats))}
+        return self._submit(ExportJob(id=uuid.uuid4().hex, format='batch', start=start, end=end or start, options=options))
+
+    def _submit(self, job: ExportJob) -> ExportJob:
+        with self._lock:
+            for existing in self._jobs.values():
+                if existing.active and existing.key == job.key:
+                    return existing
+            self._jobs[job.id] = job
+            self._prune()
+        self._pool.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str) -> Optional[ExportJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[ExportJob]:
+        """Request cancellation. Queued jobs never start; running ones stop at the next checkpoint."""
+        job = self.get(job_id)
+        if job and job.active:
+            job._cancel.set()
+            if job.status == QUEUED:
+                self._finish(job, CANCELLED)
+        return job
+
+    def shutdown(self):
+        """Cancel everything still pending and stop the workers."""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            job._cancel.set()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, job: ExportJob):
+        if job._cancel.is_set():
+            return
+        job.status = RUNNING
+
+        def on_progress(fraction: float, stage: str):
+            if job._cancel.is_set():
+                raise ExportCancelled()
+            job.progress = fraction
+            job.stage = stage
+
+        try:
+            if job.format == 'batch':
+                batch = export_batch(job.start, job.end, job.options['period'], job.options['formats'], progress=on_progress)
+                job.path, job.result = batch.path, batch.to_dict()
+            else:
+                job.path = EXPORTERS[job.format](job.start, job.end, progress=on_progress)
+        except ExportCancelled:
+            self._finish(job, CANCELLED)
+        except Exception as e:
+            job.error = str(e)
+            self._finish(job, FAILED)
+        else:
+            job.progress = 1.0
+            self._finish(job, DONE)
+
+    def _finish(self, job: ExportJob, status: str):
+        job.status = status
+        job.stage = status
+        job.finished_at = time.time()
+
+    def _prune(self):
+        """Forget the oldest finished jobs beyond keep_finished (lock held)."""
+        finished = [job for job in self._jobs.values() if not job.active]
+        finished.sort(key=lambda job: job.finished_at or job.created_at)
+        for job in finished[:max(0, len(finished) - self.keep_finished)]:
+            del self._jobs[job.id]
+
+    def stats(self) -> dict:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        counts: dict[str, int] = {}
+        for job in jobs:
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return counts
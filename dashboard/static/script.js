@@ -9,12 +9,17 @@
 
 const state = {
     currentActivity: null,
+    activityReceivedAt: 0,
     todayData: null,
     monitorData: null,
     sessions: null,
+    labels: null,
     eventSource: null
 };
 
+// Rows shown in the session log
+const SESSION_LOG_LIMIT = 10;
+
 // ═══════════════════════════════════════════════════════════════
 // App Icons - Multi-Source Icon System  
 // ═══════════════════════════════════════════════════════════════
@@ -239,7 +244,9 @@ function initElements() {
 async function fetchTodayData() {
     try {
         const response = await fetch('/api/today');
-        state.todayData = await response.json();
+        const data = await response.json();
+        stampRows(data.summary, generatedAt(response));
+        state.todayData = data;
         renderTodayData();
     } catch (err) {
         console.error('Error fetching today data:', err);
@@ -249,7 +256,7 @@ async function fetchTodayData() {
 async function fetchMonitorData() {
     try {
         const response = await fetch('/api/monitors');
-        state.monitorData = await response.json();
+        state.monitorData = stampRows(await response.json(), generatedAt(response));
         renderMonitorData();
     } catch (err) {
         console.error('Error fetching monitor data:', err);
@@ -258,8 +265,8 @@ async function fetchMonitorData() {
 
 async function fetchSessions() {
     try {
-        const response = await fetch('/api/sessions?limit=10'); // Reduced from 15 for faster loading
-        state.sessions = await response.json();
+        const response = await fetch(`/api/sessions?limit=${SESSION_LOG_LIMIT}`);
+        state.sessions = stampRows(await response.json(), generatedAt(response));
         renderSessions();
     } catch (err) {
         console.error('Error fetching sessions:', err);
@@ -271,22 +278,42 @@ async function fetchSessions() {
 // ═══════════════════════════════════════════════════════════════
 
 function connectSSE() {
+    const reconnecting = state.eventSource !== null;
     if (state.eventSource) {
         state.eventSource.close();
     }
 
     state.eventSource = new EventSource('/api/stream');
 
+    // Events sent while disconnected are lost, so resync once after a reconnect
+    state.eventSource.onopen = () => {
+        if (!reconnecting) return;
+        fetchTodayData();
+        fetchMonitorData();
+        fetchSessions();
+        loadLabels();
+    };
+
     state.eventSource.onmessage = (event) => {
         try {
             const data = JSON.parse(event.data);
             state.currentActivity = data;
+            // The server only pushes on change; timers are advanced locally from here
+            state.activityReceivedAt = Date.now();
             renderCurrentActivity();
         } catch (err) {
             console.error('SSE parse error:', err);
         }
     };
 
+    // Typed delta events: patch local state instead of re-fetching
+    state.eventSource.addEventListener('session_started', (event) => applySessionStarted(JSON.parse(event.data)));
+    state.eventSource.addEventListener('session_ended', (event) => applySessionEnded(JSON.parse(event.data)));
+    state.eventSource.addEventListener('totals_changed', (event) => applyTotalsChanged(JSON.parse(event.data)));
+    state.eventSource.addEventListener('label_upserted', (event) => applyLabelUpserted(JSON.parse(event.data)));
+    state.eventSource.addEventListener('label_deleted', (event) => applyLabelDeleted(JSON.parse(event.data)));
+    state.eventSource.addEventListener('active_label_changed', (event) => applyActiveLabelChanged(JSON.parse(event.data)));
+
     state.eventSource.onerror = (err) => {
         console.error('SSE error:', err);
         // Reconnect after 5 seconds
@@ -294,10 +321,134 @@ function connectSSE() {
     };
 }
 
+// ═══════════════════════════════════════════════════════════════
+// Delta Events
+// ═══════════════════════════════════════════════════════════════
+
+// Remember when each row was computed so the open session's time can be extrapolated
+function stampRows(rows, at = Date.now()) {
+    (rows || []).forEach(row => { row._receivedAt = at; });
+    return rows;
+}
+
+// Responses may be served from the server's ETag cache; use when they were computed
+function generatedAt(response) {
+    return Number(response.headers.get('X-Generated-At')) || Date.now();
+}
+
+function upsertRow(rows, row, key) {
+    const index = rows.findIndex(item => item[key] === row[key]);
+    if (index >= 0) {
+        rows[index] = row;
+    } else {
+        rows.push(row);
+    }
+}
+
+function applySessionStarted(session) {
+    stampRows([session]);
+    const sessions = (state.sessions || []).filter(item => item.id !== session.id);
+    state.sessions = [session, ...sessions].slice(0, SESSION_LOG_LIMIT);
+    renderSessions();
+}
+
+function applySessionEnded(session) {
+    if (!state.sessions) return;
+    const index = state.sessions.findIndex(item => item.id === session.id);
+    if (index < 0) return;
+    state.sessions[index] = stampRows([session])[0];
+    renderSessions();
+}
+
+function applyTotalsChanged(data) {
+    if (!state.todayData || !state.monitorData || data.day !== state.todayData.day) {
+        // First event before the initial load, or the day rolled over
+        fetchTodayData();
+        fetchMonitorData();
+        return;
+    }
+
+    stampRows(data.apps).forEach(row => upsertRow(state.todayData.summary, row, 'app_name'));
+    state.todayData.summary.sort((a, b) => b.total_seconds - a.total_seconds);
+    stampRows(data.monitors).forEach(row => upsertRow(state.monitorData, row, 'monitor'));
+    state.monitorData.sort((a, b) => a.monitor - b.monitor);
+
+    renderTodayData();
+    renderMonitorData();
+}
+
+function applyLabelUpserted(data) {
+    if (!state.labels) return;
+    upsertRow(state.labels, data.label, 'id');
+    renderLabels();
+}
+
+function applyLabelDeleted(data) {
+    if (!state.labels) return;
+    state.labels = state.labels.filter(label => label.id !== data.id);
+    renderLabels();
+}
+
+function applyActiveLabelChanged(data) {
+    if (!state.labels) return;
+    currentActiveLabelId = data.active_session_label_id || 0;
+    const active = state.labels.find(label => label.id === currentActiveLabelId);
+    document.getElementById('active-label-chip').innerHTML = active ? active.name : "General";
+    renderLabels();
+}
+
 // ═══════════════════════════════════════════════════════════════
 // Render Functions
 // ═══════════════════════════════════════════════════════════════
 
+function secondsSince(receivedAt) {
+    return Math.max(0, Math.floor((Date.now() - receivedAt) / 1000));
+}
+
+function currentElapsedSeconds(activity) {
+    return (activity?.elapsed_seconds || 0) + secondsSince(state.activityReceivedAt);
+}
+
+// Totals include the open session as of when they arrived; only its app/monitor keep growing
+function liveAppSeconds(item) {
+    const activity = state.currentActivity;
+    const open = activity && !activity.is_idle && activity.app_name === item.app_name;
+    return item.total_seconds + (open ? secondsSince(item._receivedAt) : 0);
+}
+
+function liveMonitorSeconds(item) {
+    const activity = state.currentActivity;
+    const open = activity && !activity.is_idle && activity.monitor === item.monitor;
+    return item.total_seconds + (open ? secondsSince(item._receivedAt) : 0);
+}
+
+function liveSessionSeconds(session) {
+    const open = session.end_time === null || session.end_time === undefined;
+    return (session.duration_seconds || 0) + (open ? secondsSince(session._receivedAt) : 0);
+}
+
+// Advance the running counters between pushed events without rebuilding the lists
+function renderLiveCounters() {
+    renderCurrentActivity();
+
+    if (state.todayData?.summary) {
+        const total = state.todayData.summary.reduce((acc, item) => acc + liveAppSeconds(item), 0);
+        elements.totalTime.textContent = formatDurationCompact(total);
+        state.todayData.summary.forEach((item, index) => {
+            const node = elements.appList.querySelector(`.app-time[data-index="${index}"]`);
+            if (node) node.textContent = formatDurationFull(liveAppSeconds(item));
+        });
+    }
+
+    renderMonitorData();
+
+    (state.sessions || []).forEach((session, index) => {
+        if (session.end_time !== null && session.end_time !== undefined) return;
+        const node = elements.sessionLog.querySelector(`.session-duration[data-index="${index}"]`);
+        if (node) node.textContent = formatDurationFull(liveSessionSeconds(session));
+    });
+}
+
 function renderCurrentActivity() {
     const activity = state.currentActivity;
 
@@ -305,7 +456,7 @@ function renderCurrentActivity() {
         elements.currentAppIcon.innerHTML = createAppIconHtml('Idle', 'large');
         elements.currentAppName.textContent = activity?.is_idle ? 'Idle' : 'No Activity';
         elements.currentWindowTitle.textContent = activity?.is_idle ? 'User is idle - not tracking' : 'No active window detected';
-        elements.currentTimer.textContent = activity?.idle_duration_formatted || '00:00';
+        elements.currentTimer.textContent = activity?.is_idle ? formatDuration(currentElapsedSeconds(activity)) : '00:00';
         elements.currentMonitor.textContent = 'Monitor -';
         return;
     }
@@ -314,7 +465,7 @@ function renderCurrentActivity() {
     elements.currentAppIcon.innerHTML = createAppIconHtml(appName, 'large');
     elements.currentAppName.textContent = appName;
     elements.currentWindowTitle.textContent = truncateText(activity.window_title, 80);
-    elements.currentTimer.textContent = activity.elapsed_formatted || formatDuration(activity.elapsed_seconds);
+    elements.currentTimer.textContent = formatDurationFull(currentElapsedSeconds(activity));
     elements.currentMonitor.textContent = `Monitor ${activity.monitor}`;
 }
 
@@ -323,7 +474,8 @@ function renderTodayData() {
     if (!data) return;
 
     // Update stats
-    elements.totalTime.textContent = data.total_formatted || '0s';
+    const totalSeconds = data.summary?.reduce((acc, item) => acc + liveAppSeconds(item), 0) || 0;
+    elements.totalTime.textContent = formatDurationCompact(totalSeconds);
     elements.totalApps.textContent = data.summary?.length || 0;
     
     // Count total sessions
@@ -342,7 +494,7 @@ function renderTodayData() {
 
     const maxTime = Math.max(...data.summary.map(item => item.total_seconds));
 
-    elements.appList.innerHTML = data.summary.map(item => {
+    elements.appList.innerHTML = data.summary.map((item, index) => {
         const appName = item.app_display || item.app_name;
         const percentage = maxTime > 0 ? (item.total_seconds / maxTime) * 100 : 0;
 
@@ -356,7 +508,7 @@ function renderTodayData() {
                         <div class="progress-fill" style="width: ${percentage}%"></div>
                     </div>
                 </div>
-                <div class="app-time">${item.duration_formatted}</div>
+                <div class="app-time" data-index="${index}">${formatDurationFull(liveAppSeconds(item))}</div>
             </div>
         `;
     }).join('');
@@ -373,8 +525,8 @@ function renderMonitorData() {
     const monitor1 = data.find(m => m.monitor === 1);
     const monitor2 = data.find(m => m.monitor === 2);
 
-    elements.monitor1Time.textContent = monitor1?.duration_formatted || '0s';
-    elements.monitor2Time.textContent = monitor2?.duration_formatted || '0s';
+    elements.monitor1Time.textContent = monitor1 ? formatDurationFull(liveMonitorSeconds(monitor1)) : '0s';
+    elements.monitor2Time.textContent = monitor2 ? formatDurationFull(liveMonitorSeconds(monitor2)) : '0s';
 }
 
 function renderSessions() {
@@ -389,7 +541,7 @@ function renderSessions() {
         return;
     }
 
-    elements.sessionLog.innerHTML = sessions.map(session => {
+    elements.sessionLog.innerHTML = sessions.map((session, index) => {
         const isIdle = session.is_idle || session.app_name === 'Idle';
         const appName = session.app_display || session.app_name;
         //const itemClass = isIdle ? 'session-item session-idle' : 'session-item';
@@ -399,7 +551,7 @@ function renderSessions() {
                 <span class="session-time">${session.start_formatted || '--:--'}</span>
                 <span class="session-app">${appName}</span>
                 <span class="session-title">${isIdle ? 'User was idle' : truncateText(session.window_title, 40)}</span>
-                <span class="session-duration">${session.duration_formatted}</span>
+                <span class="session-duration" data-index="${index}">${formatDurationFull(liveSessionSeconds(session))}</span>
                 <span class="session-monitor">${isIdle ? '-' : 'M' + session.monitor}</span>
             </div>
         `;
@@ -431,6 +583,36 @@ function formatDuration(seconds) {
     return `${secs}s`;
 }
 
+// Mirrors tracker.utils.format_duration ('2h 15m 30s')
+function formatDurationFull(seconds) {
+    if (!seconds || seconds < 0) return '0s';
+
+    const hours = Math.floor(seconds / 3600);
+    const minutes = Math.floor((seconds % 3600) / 60);
+    const secs = seconds % 60;
+
+    const parts = [];
+    if (hours > 0) parts.push(`${hours}h`);
+    if (minutes > 0) parts.push(`${minutes}m`);
+    if (secs > 0 || parts.length === 0) parts.push(`${secs}s`);
+    return parts.join(' ');
+}
+
+// Mirrors tracker.utils.format_duration_compact ('02:15:30')
+function formatDurationCompact(seconds) {
+    if (!seconds || seconds < 0) seconds = 0;
+
+    const hours = Math.floor(seconds / 3600);
+    const minutes = Math.floor((seconds % 3600) / 60);
+    const secs = seconds % 60;
+    const pad = (n) => String(n).padStart(2, '0');
+
+    if (hours > 0) {
+        return `${pad(hours)}:${pad(minutes)}:${pad(secs)}`;
+    }
+    return `${pad(minutes)}:${pad(secs)}`;
+}
+
 // ═══════════════════════════════════════════════════════════════
 // Initialization
 // ═══════════════════════════════════════════════════════════════
@@ -461,12 +643,9 @@ function init() {
     // Connect to live updates
     connectSSE();
 
-    // Refresh aggregated data every 30 seconds
-    setInterval(() => {
-        fetchTodayData();
-        fetchMonitorData();
-        fetchSessions();
-    }, 30000);
+    // Advance the live timers between pushed updates; totals and sessions
+    // are patched by the server's delta events, so nothing is polled
+    setInterval(renderLiveCounters, 1000);
 
     console.log('✅ Dashboard ready!');
 }
@@ -597,67 +776,103 @@ function formatDateForInput(date) {
     return date.toISOString().split('T')[0];
 }
 
-function exportWithDates(format) {
+// CSV and NDJSON are streamed straight from the database; the browser shows the download as it arrives
+function streamExport(format) {
     const startDate = document.getElementById('export-start-date').value;
     const endDate = document.getElementById('export-end-date').value;
-    
-    // Build URL with date parameters
-    let url = `/api/export/${format}`;
+
     const params = [];
-    
     if (startDate) params.push(`start=${startDate}`);
     if (endDate) params.push(`end=${endDate}`);
-    
-    if (params.length > 0) {
-        url += '?' + params.join('&');
-    }
+
+    const timestamp = new Date().toISOString().slice(0, 19).replace(/[T:]/g, '-');
+    const dateRange = startDate ? `_${startDate}` + (endDate && endDate !== startDate ? `_to_${endDate}` : '') : '';
+
+    const a = document.createElement('a');
+    a.href = `/api/export/${format}` + (params.length > 0 ? '?' + params.join('&') : '');
+    a.download = `sessions${dateRange}_${timestamp}.${format}`;
+    document.body.appendChild(a);
+    a.click();
+    a.remove();
+}
+
+// Export jobs in flight, by format (clicking the button again cancels)
+const activeExportJobs = {};
+const EXPORT_POLL_MS = 500;
+
+async function exportWithDates(format) {
+    const startDate = document.getElementById('export-start-date').value;
+    const endDate = document.getElementById('export-end-date').value;
     
     // Get the clicked button
     const btn = event.target.closest('.format-btn');
+
+    if (activeExportJobs[format]) {
+        await fetch(`/api/export-jobs/${activeExportJobs[format]}`, { method: 'DELETE' });
+        return;
+    }
+
     const originalHTML = btn.innerHTML;
+    const restoreButton = () => {
+        setTimeout(() => {
+            btn.innerHTML = originalHTML;
+        }, 2000);
+    };
     
     // Show loading state
-    btn.innerHTML = '<span class="format-icon">⏳</span><span class="format-name">Exporting...</span><span class="format-desc">Please wait</span>';
-    btn.disabled = true;
+    btn.innerHTML = '<span class="format-icon">⏳</span><span class="format-name">Exporting...</span><span class="format-desc">Click to cancel</span>';
     
-    // Trigger download
-    fetch(url)
-        .then(response => {
-            if (!response.ok) throw new Error('Export failed');
-            return response.blob();
-        })
-        .then(blob => {
-            // Generate filename
-            const timestamp = new Date().toISOString().slice(0, 19).replace(/[T:]/g, '-');
-            const ext = format === 'html' ? 'html' : format;
-            const dateRange = startDate ? `_${startDate}` + (endDate && endDate !== startDate ? `_to_${endDate}` : '') : '';
-            const filename = format === 'html' ? `report${dateRange}_${timestamp}.${ext}` : `sessions${dateRange}_${timestamp}.${ext}`;
-            
-            // Create download link
-            const downloadUrl = window.URL.createObjectURL(blob);
-            const a = document.createElement('a');
-            a.href = downloadUrl;
-            a.download = filename;
-            document.body.appendChild(a);
-            a.click();
-            window.URL.revokeObjectURL(downloadUrl);
-            a.remove();
-            
-            // Success feedback
-            btn.innerHTML = '<span class="format-icon">✅</span><span class="format-name">Done!</span><span class="format-desc">Downloaded</span>';
-            setTimeout(() => {
-                btn.innerHTML = originalHTML;
-                btn.disabled = false;
-            }, 2000);
-        })
-        .catch(err => {
-            console.error('Export error:', err);
-            btn.innerHTML = '<span class="format-icon">❌</span><span class="format-name">Failed</span><span class="format-desc">Try again</span>';
-            setTimeout(() => {
-                btn.innerHTML = originalHTML;
-                btn.disabled = false;
-            }, 2000);
+    try {
+        // The report is built in the background; poll the job until it finishes
+        const response = await fetch('/api/export-jobs', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ format, start: startDate || null, end: endDate || null })
         });
+        if (!response.ok) throw new Error('Export failed');
+        let job = await response.json();
+        activeExportJobs[format] = job.id;
+
+        while (job.status === 'queued' || job.status === 'running') {
+            await new Promise(resolve => setTimeout(resolve, EXPORT_POLL_MS));
+            const statusResponse = await fetch(`/api/export-jobs/${job.id}`);
+            if (!statusResponse.ok) throw new Error('Export failed');
+            job = await statusResponse.json();
+            const percent = Math.round(job.progress * 100);
+            btn.innerHTML = `<span class="format-icon">⏳</span><span class="format-name">${percent}% ${job.stage}</span><span class="format-desc">Click to cancel</span>`;
+        }
+        delete activeExportJobs[format];
+
+        if (job.status === 'cancelled') {
+            btn.innerHTML = '<span class="format-icon">⏹️</span><span class="format-name">Cancelled</span><span class="format-desc">Export stopped</span>';
+            restoreButton();
+            return;
+        }
+        if (job.status !== 'done') throw new Error(job.error || 'Export failed');
+
+        // Generate filename
+        const timestamp = new Date().toISOString().slice(0, 19).replace(/[T:]/g, '-');
+        const ext = format === 'html' ? 'html' : format;
+        const dateRange = startDate ? `_${startDate}` + (endDate && endDate !== startDate ? `_to_${endDate}` : '') : '';
+        const filename = format === 'html' ? `report${dateRange}_${timestamp}.${ext}` : `sessions${dateRange}_${timestamp}.${ext}`;
+        
+        // Download straight from the job result
+        const a = document.createElement('a');
+        a.href = `/api/export-jobs/${job.id}/result`;
+        a.download = filename;
+        document.body.appendChild(a);
+        a.click();
+        a.remove();
+        
+        // Success feedback
+        btn.innerHTML = '<span class="format-icon">✅</span><span class="format-name">Done!</span><span class="format-desc">Downloaded</span>';
+        restoreButton();
+    } catch (err) {
+        delete activeExportJobs[format];
+        console.error('Export error:', err);
+        btn.innerHTML = '<span class="format-icon">❌</span><span class="format-name">Failed</span><span class="format-desc">Try again</span>';
+        restoreButton();
+    }
 }
 
 async function updateTaskStatus(labelId, newStatus) {
@@ -718,7 +933,12 @@ let hideDoneTasks = false;
 
 async function loadLabels() {
     const response = await fetch('/api/session-labels');
-    const labels = await response.json();
+    state.labels = await response.json();
+    renderLabels();
+}
+
+function renderLabels() {
+    const labels = state.labels || [];
     const container = document.getElementById('label-container');
     
     container.innerHTML = '';
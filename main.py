@@ -6,17 +6,26 @@ Main entry point that starts the activity monitor and dashboard server.
 Usage:
     python main.py              # Start both tracker and dashboard
     python main.py --no-browser # Start without opening browser
+    python main.py --no-dashboard # Track only; the web dashboard is never imported
+    python main.py --startup-report # Print startup phase timings and time to first sample
+    python main.py --rebuild-rollups # Same as `python main.py rebuild-rollups`
+    python main.py stats --range week # Subcommands are handled by tracker.cli (see --help)
+
+Only what sampling needs is imported up front. The export code loads on the
+first export, the Google client stack on the first upload and uvicorn plus
+the dashboard once the first sample is taken (and only if enabled).
+`python benchmarks/startup.py` reports import times like `-X importtime`.
 """
 
-import sys
 import time
+_IMPORT_STARTED = time.perf_counter()
+
+import sys
 import signal
 import threading
-import webbrowser
 import os
 import psutil
 import warnings
-import asyncio
 from datetime import datetime
 from typing import Optional
 from pathlib import Path
@@ -24,16 +33,31 @@ from pathlib import Path
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent))
 
+# --rebuild-rollups is the older spelling of the rebuild-rollups command (same checks and lock)
+if __name__ == "__main__" and sys.argv[1:2] and sys.argv[1].startswith("-") and "--rebuild-rollups" in sys.argv:
+    sys.argv[1:] = ["rebuild-rollups"]
+
+# Subcommands (stats, export, compact, ...) never need the monitor, so hand off before importing it
+if __name__ == "__main__" and len(sys.argv) > 1 and not sys.argv[1].startswith("-"):
+    from tracker.cli import main as cli_main
+    sys.exit(cli_main(sys.argv[1:]))
+
 from tracker.monitor import get_monitor
-from tracker.db import init_db
-from tracker.export import export_html
-from upload import upload_file
+from tracker.db import close_connections
+from tracker.instance import LOCK_FILE
+from tracker.uploads import get_upload_queue
+from tracker.sinks import DriveSink
+
+_IMPORT_FINISHED = time.perf_counter()
 
 
 # Constants
 APP_START_TIME: Optional[datetime] = None
-LOCK_FILE = Path(__file__).parent / "workshot.pid"
 DAILIES_FILE = Path(__file__).parent / "logs" / "dailies.md"
+# Longest shutdown waits for an upload already in flight (unfinished ones resume next start)
+UPLOAD_SHUTDOWN_GRACE = 3.0
+# Target for process start -> first activity sample, checked by --startup-report
+FIRST_SAMPLE_TARGET_MS = 1000
 
 def manage_single_instance():
     """Ensure mutual exclusion using a PID lock file."""
@@ -129,19 +153,22 @@ def signal_handler(signum, frame):
         runtime_seconds = (datetime.now() - APP_START_TIME).total_seconds()
         if runtime_seconds > 18000:  # 5 hours = 18000 seconds
             try:
+                from tracker.export import export_html
+                
                 print("[*] Auto-exporting today's data...")
                 today = datetime.now().strftime("%Y-%m-%d")
                 filepath = export_html(start_date=today, end_date=today)
                 print(f"[+] Report saved: {filepath}")
                 
-                try:
-                    print("[*] Uploading to Google Drive...")
-                    upload_file(str(filepath))
-                except Exception as e:
-                    print(f"[!] Upload failed: {e}")
+                get_upload_queue().enqueue(str(filepath))
+                print("[*] Queued for Google Drive upload")
             except Exception as e:
                 print(f"[!] Auto-export failed: {e}")
     
+    if not get_upload_queue().stop(timeout=UPLOAD_SHUTDOWN_GRACE):
+        print("[*] Upload still running, it will resume on next start")
+    close_connections()
+    
     if LOCK_FILE.exists():
         LOCK_FILE.unlink()
     
@@ -150,10 +177,12 @@ def signal_handler(signum, frame):
 
 def start_dashboard_server(host: str, port: int):
     """Runs the FastAPI app via Uvicorn."""
+    import asyncio
     import uvicorn
     from dashboard.app import app
     
     if sys.platform == "win32":
+        asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
         try:
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
@@ -170,6 +199,18 @@ def suppress_asyncio_errors(loop, context):
         return
     loop.default_exception_handler(context)
 
+def print_startup_report(timings: dict[str, float], first_sample_ms: Optional[float]):
+    """Print how long each startup phase took and when the first sample landed."""
+    print("[*] Startup report")
+    for phase, ms in timings.items():
+        print(f"    {phase:<20} {ms:8.1f} ms")
+    if first_sample_ms is None:
+        print("    first sample         not taken yet")
+        return
+    verdict = "OK" if first_sample_ms <= FIRST_SAMPLE_TARGET_MS else "SLOW"
+    print(f"    first sample         {first_sample_ms:8.1f} ms after process start "
+          f"(target {FIRST_SAMPLE_TARGET_MS} ms: {verdict})")
+
 def print_banner():
     """Print startup banner."""
     banner = """
@@ -181,40 +222,56 @@ def print_banner():
     """
     print(banner)
 
-def main():
+def main(argv: Optional[list[str]] = None):
+    """Run the tracker (and dashboard) until interrupted; `argv` defaults to the command-line flags."""
     global APP_START_TIME
+    argv = sys.argv[1:] if argv is None else argv
     warnings.filterwarnings("ignore", category=RuntimeWarning, module="asyncio")
-    
-    if sys.platform == "win32":
-        asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
 
     # Show Workshot banner
     print_banner()
-
+    
     manage_single_instance()
     APP_START_TIME = datetime.now()
     
     # Config
-    open_browser = "--no-browser" not in sys.argv
+    dashboard_enabled = "--no-dashboard" not in argv
+    open_browser = dashboard_enabled and "--no-browser" not in argv
     host, port = "127.0.0.1", 8787
+    timings = {'imports': (_IMPORT_FINISHED - _IMPORT_STARTED) * 1000}
     
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
     
-    init_db()
-    
-    # Start Monitor
+    # Start Monitor (initializes the database first)
+    started = time.perf_counter()
     monitor = get_monitor()
     monitor.start()
+    timings['database + monitor'] = (time.perf_counter() - started) * 1000
+    
+    # Drain queued Drive uploads (including any left over from the last run)
+    get_upload_queue().start(DriveSink().push)
+    
+    # Let the first sample land before the dashboard imports compete with it for the GIL
+    monitor.first_sample.wait(timeout=2.0)
+    first_sample_ms = None
+    if monitor.first_sample_at:
+        first_sample_ms = (monitor.first_sample_at - psutil.Process().create_time()) * 1000
     
-    # Start Dashboard
-    threading.Thread(target=start_dashboard_server, args=(host, port), daemon=True).start()
+    if dashboard_enabled:
+        started = time.perf_counter()
+        threading.Thread(target=start_dashboard_server, args=(host, port), daemon=True).start()
+        time.sleep(1.5)
+        timings['dashboard'] = (time.perf_counter() - started) * 1000
+        if open_browser:
+            import webbrowser
+            webbrowser.open(f"http://{host}:{port}")
     
-    time.sleep(1.5)
-    if open_browser:
-        webbrowser.open(f"http://{host}:{port}")
+    if "--startup-report" in argv:
+        print_startup_report(timings, first_sample_ms)
     
-    print(f"\n[+] WorkShot Running\n    Dashboard: http://{host}:{port}\n    Dailies: {DAILIES_FILE}\n")
+    dashboard_line = f"http://{host}:{port}" if dashboard_enabled else "disabled (--no-dashboard)"
+    print(f"\n[+] WorkShot Running\n    Dashboard: {dashboard_line}\n    Dailies: {DAILIES_FILE}\n")
     
     try:
         while True: time.sleep(1)
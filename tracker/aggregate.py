@@ -0,0 +1,181 @@
+"""Single-pass aggregation of session rows for exports and reports."""
+
+import heapq
+from typing import Iterable, Optional
+
+from .utils import sanitize_app_name
+
+# Titles beyond the per-app cap are summed under this key
+OTHER_TITLES = "(other titles)"
+
+
+class SessionAggregator:
+    """
+    Running totals over a stream of session rows, consumed once.
+
+    Keeps per-app (with per-title), per-monitor and per-label seconds and
+    session counts, plus the longest `top_n` sessions in a min-heap.
+    Memory is bounded by the number of distinct apps, monitors and labels:
+    each app tracks at most `max_titles_per_app` distinct titles and folds
+    the rest into OTHER_TITLES. Aggregators over disjoint rows can be
+    combined with merge(), e.g. to build a range from per-day results.
+    """
+
+    def __init__(self, top_n: int = 50, max_titles_per_app: int = 500):
+        self.top_n = top_n
+        self.max_titles_per_app = max_titles_per_app
+        self.total_seconds = 0
+        self.session_count = 0
+        # app_name -> {'total_seconds', 'session_count', 'titles': {title: seconds}}
+        self.apps: dict[str, dict] = {}
+        self.monitors: dict[int, list[int]] = {}            # monitor -> [seconds, count]
+        self.labels: dict[Optional[int], list[int]] = {}    # session_label_id -> [seconds, count]
+        self._top: list[tuple] = []                         # min-heap of (duration, id, session)
+
+    def add(self, session: dict):
+        """Fold one session row into the totals."""
+        duration = session['duration_seconds'] or 0
+        self.total_seconds += duration
+        self.session_count += 1
+
+        app = self.apps.get(session['app_name'])
+        if app is None:
+            app = self.apps[session['app_name']] = {'total_seconds': 0, 'session_count': 0, 'titles': {}}
+        app['total_seconds'] += duration
+        app['session_count'] += 1
+        self._add_title(app['titles'], session['window_title'] or "Unknown Task", duration)
+
+        monitor = self.monitors.setdefault(session['monitor'], [0, 0])
+        monitor[0] += duration
+        monitor[1] += 1
+
+        label = self.labels.setdefault(session.get('session_label_id'), [0, 0])
+        label[0] += duration
+        label[1] += 1
+
+        if self.top_n > 0:
+            entry = (duration, session['id'], {
+                'id': session['id'],
+                'app_name': session['app_name'],
+                'window_title': session['window_title'],
+                'monitor': session['monitor'],
+                'start_time': session['start_time'],
+                'duration_seconds': duration,
+                'is_idle': session.get('is_idle') or 0,
+            })
+            if len(self._top) < self.top_n:
+                heapq.heappush(self._top, entry)
+            elif entry[:2] > self._top[0][:2]:
+                heapq.heapreplace(self._top, entry)
+
+    def add_many(self, sessions: Iterable[dict]):
+        for session in sessions:
+            self.add(session)
+
+    def _add_title(self, titles: dict[str, int], title: str, seconds: int):
+        if title in titles or len(titles) < self.max_titles_per_app:
+            titles[title] = titles.get(title, 0) + seconds
+        else:
+            titles[OTHER_TITLES] = titles.get(OTHER_TITLES, 0) + seconds
+
+    def merge(self, other: 'SessionAggregator'):
+        """Add another aggregator's totals (over different rows) into this one."""
+        self.total_seconds += other.total_seconds
+        self.session_count += other.session_count
+        for name, theirs in other.apps.items():
+            app = self.apps.get(name)
+            if app is None:
+                app = self.apps[name] = {'total_seconds': 0, 'session_count': 0, 'titles': {}}
+            app['total_seconds'] += theirs['total_seconds']
+            app['session_count'] += theirs['session_count']
+            for title, seconds in theirs['titles'].items():
+                self._add_title(app['titles'], title, seconds)
+        for key, (seconds, count) in other.monitors.items():
+            monitor = self.monitors.setdefault(key, [0, 0])
+            monitor[0] += seconds
+            monitor[1] += count
+        for key, (seconds, count) in other.labels.items():
+            label = self.labels.setdefault(key, [0, 0])
+            label[0] += seconds
+            label[1] += count
+        for entry in other._top:
+            if len(self._top) < self.top_n:
+                heapq.heappush(self._top, entry)
+            elif entry[:2] > self._top[0][:2]:
+                heapq.heapreplace(self._top, entry)
+
+    def by_app(self) -> list[dict]:
+        """Per-app totals, longest first (keyed by raw app name)."""
+        result = [
+            {
+                'app_name': name,
+                'app_display': sanitize_app_name(name),
+                'total_seconds': app['total_seconds'],
+                'session_count': app['session_count'],
+            }
+            for name, app in self.apps.items()
+        ]
+        result.sort(key=lambda x: x['total_seconds'], reverse=True)
+        return result
+
+    def by_display_name(self) -> list[dict]:
+        """Per-app totals grouped by display name, with per-title seconds, longest first."""
+        groups: dict[str, dict] = {}
+        for name, app in self.apps.items():
+            display = sanitize_app_name(name)
+            group = groups.setdefault(display, {'app_name': display, 'total_seconds': 0, 'session_count': 0, 'titles': {}})
+            group['total_seconds'] += app['total_seconds']
+            group['session_count'] += app['session_count']
+            for title, seconds in app['titles'].items():
+                group['titles'][title] = group['titles'].get(title, 0) + seconds
+        result = list(groups.values())
+        for group in result:
+            group['titles'] = sorted(group['titles'].items(), key=lambda x: x[1], reverse=True)
+        result.sort(key=lambda x: x['total_seconds'], reverse=True)
+        return result
+
+    def by_monitor(self) -> list[dict]:
+        """Per-monitor totals for real monitors (idle sessions use monitor 0)."""
+        return [
+            {'monitor': m, 'total_seconds': seconds, 'session_count': count}
+            for m, (seconds, count) in sorted(self.monitors.items())
+            if m > 0
+        ]
+
+    def by_label(self) -> list[dict]:
+        """Per-label totals, longest first (None = unlabelled)."""
+        result = [
+            {'session_label_id': label_id, 'total_seconds': seconds, 'session_count': count}
+            for label_id, (seconds, count) in self.labels.items()
+        ]
+        result.sort(key=lambda x: x['total_seconds'], reverse=True)
+        return result
+
+    def top_sessions(self) -> list[dict]:
+        """The longest sessions, longest first."""
+        return [session for _, _, session in sorted(self._top, key=lambda e: e[:2], reverse=True)]
+
+    def to_dict(self) -> dict:
+        """JSON-serializable state; from_dict() restores it."""
+        return {
+            'top_n': self.top_n,
+            'max_titles_per_app': self.max_titles_per_app,
+            'total_seconds': self.total_seconds,
+            'session_count': self.session_count,
+            'apps': self.apps,
+            'monitors': [[m, seconds, count] for m, (seconds, count) in self.monitors.items()],
+            'labels': [[label_id, seconds, count] for label_id, (seconds, count) in self.labels.items()],
+            'top': self.top_sessions(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'SessionAggregator':
+        agg = cls(top_n=data['top_n'], max_titles_per_app=data['max_titles_per_app'])
+        agg.total_seconds = data['total_seconds']
+        agg.session_count = data['session_count']
+        agg.apps = data['apps']
+        agg.monitors = {m: [seconds, count] for m, seconds, count in data['monitors']}
+        agg.labels = {label_id: [seconds, count] for label_id, seconds, count in data['labels']}
+        agg._top = [(s['duration_seconds'], s['id'], s) for s in data['top']]
+        heapq.heapify(agg._top)
+        return agg
@@ -0,0 +1,201 @@
+"""
+Batch export: one report per day or week of a date range, rendered in parallel.
+
+Usage:
+    python -m tracker.batch --start 2026-09-01 --end 2026-09-30
+    python -m tracker.batch --start 2026-07-01 --end 2026-09-30 --period week --format html json
+"""
+
+import argparse
+import json
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+from . import db, export
+from .export import EXPORTERS, ProgressCallback
+
+PERIODS = ('day', 'week')
+# Upper bound on worker processes; rendering is CPU-bound once a day's rows are read
+BATCH_MAX_WORKERS = 4
+
+
+def split_range(start_date: str, end_date: str, period: str = 'day') -> list[tuple[str, str]]:
+    """Split an inclusive date range into days, or Monday-based weeks clipped to the range."""
+    if period not in PERIODS:
+        raise ValueError(f"Unknown period: {period}. Use 'day' or 'week'.")
+    start = datetime.strptime(start_date[:10], "%Y-%m-%d").date()
+    end = datetime.strptime(end_date[:10], "%Y-%m-%d").date()
+    if end < start:
+        raise ValueError("End date is before start date")
+
+    parts = []
+    current = start
+    while current <= end:
+        if period == 'day':
+            last = current
+        else:
+            last = min(current + timedelta(days=6 - current.weekday()), end)
+        parts.append((current.isoformat(), last.isoformat()))
+        current = last + timedelta(days=1)
+    return parts
+
+
+@dataclass
+class BatchResult:
+    """A finished batch: the zip bundle plus per-report and per-worker timings."""
+    path: Path
+    start: str
+    end: str
+    period: str
+    formats: list[str]
+    elapsed_seconds: float = 0.0
+    parts: list[dict] = field(default_factory=list)
+
+    @property
+    def workers(self) -> dict[int, dict]:
+        """Reports rendered and busy time per worker process id."""
+        workers: dict[int, dict] = {}
+        for part in self.parts:
+            worker = workers.setdefault(part['worker'], {'reports': 0, 'busy_seconds': 0.0})
+            worker['reports'] += 1
+            worker['busy_seconds'] = round(worker['busy_seconds'] + part['seconds'], 3)
+        return workers
+
+    def to_dict(self) -> dict:
+        return {
+            'filename': self.path.name,
+            'start': self.start,
+            'end': self.end,
+            'period': self.period,
+            'formats': self.formats,
+            'reports': len(self.parts),
+            'elapsed_seconds': round(self.elapsed_seconds, 3),
+            'workers': [{'pid': pid, **stats} for pid, stats in sorted(self.workers.items())],
+            'parts': self.parts,
+        }
+
+
+def _init_worker(db_path: str, exports_dir: str):
+    """Point a worker process at the parent's database and exports folder."""
+    db.DB_PATH = Path(db_path)
+    export.EXPORTS_DIR = Path(exports_dir)
+
+
+def _render_part(format_type: str, start_date: str, end_date: str) -> dict:
+    """
+    Render one report in a worker process.
+
+    Exporters only read through tracker.db's read-only (mode=ro) pool, so
+    workers never contend with the tracker for the writer connection.
+    """
+    start = time.perf_counter()
+    path = EXPORTERS[format_type](start_date, end_date)
+    return {
+        'format': format_type,
+        'start': start_date,
+        'end': end_date,
+        'path': str(path),
+        'worker': os.getpid(),
+        'seconds': round(time.perf_counter() - start, 3),
+    }
+
+
+def export_batch(
+    start_date: str,
+    end_date: Optional[str] = None,
+    period: str = 'day',
+    formats: tuple[str, ...] = ('html',),
+    workers: Optional[int] = None,
+    output: Optional[Path] = None,
+    progress: Optional[ProgressCallback] = None
+) -> BatchResult:
+    """
+    Render a report per day (or week) of a range in a process pool and zip them.
+
+    Args:
+        start_date: First day (YYYY-MM-DD), inclusive
+        end_date: Last day (YYYY-MM-DD), inclusive. Defaults to start_date.
+        period: 'day' or 'week'
+        formats: Any of 'html', 'json', 'csv', 'ndjson'
+        workers: Worker processes (default: CPU count, at most BATCH_MAX_WORKERS)
+        output: Zip path (default: a timestamped batch_*.zip in the exports folder)
+        progress: Optional callback receiving (fraction, stage); may raise ExportCancelled
+
+    Each report is stored as `<format>/<range>.<ext>` in the zip, next to a
+    manifest.json with the timings returned here. Closed days come from the
+    report cache when they were exported before.
+    """
+    formats = list(dict.fromkeys(formats))
+    for format_type in formats:
+        if format_type not in EXPORTERS:
+            raise ValueError(f"Unknown format: {format_type}. Use 'csv', 'json', 'ndjson', or 'html'.")
+    end_date = end_date or start_date
+    ranges = split_range(start_date, end_date, period)
+    tasks = [(format_type, start, end) for start, end in ranges for format_type in formats]
+    workers = workers or min(len(tasks), os.cpu_count() or 1, BATCH_MAX_WORKERS)
+
+    if progress:
+        progress(0.0, "rendering")
+    result = BatchResult(path=output or export.get_export_filename("batch", "zip"),
+                         start=start_date, end=end_date, period=period, formats=formats)
+    began = time.perf_counter()
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(str(db.DB_PATH), str(export.EXPORTS_DIR)),
+    )
+    try:
+        with zipfile.ZipFile(result.path, 'w', compression=zipfile.ZIP_DEFLATED) as bundle:
+            futures = [pool.submit(_render_part, *task) for task in tasks]
+            for done, future in enumerate(as_completed(futures), start=1):
+                part = future.result()
+                label = part['start'] if part['start'] == part['end'] else f"{part['start']}_{part['end']}"
+                part['file'] = f"{part['format']}/{label}.{part['format']}"
+                bundle.write(part.pop('path'), part['file'])
+                result.parts.append(part)
+                if progress:
+                    progress(done / len(tasks), "rendering")
+            result.parts.sort(key=lambda p: (p['start'], p['format']))
+            result.elapsed_seconds = time.perf_counter() - began
+            bundle.writestr("manifest.json", json.dumps(result.to_dict(), indent=2))
+    except BaseException:
+        pool.shutdown(wait=False, cancel_futures=True)
+        result.path.unlink(missing_ok=True)
+        raise
+    pool.shutdown()
+
+    if progress:
+        progress(1.0, "done")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a report per day or week of a date range as a zip")
+    parser.add_argument('--start', required=True, help="First day (YYYY-MM-DD)")
+    parser.add_argument('--end', help="Last day (YYYY-MM-DD), defaults to --start")
+    parser.add_argument('--period', choices=PERIODS, default='day')
+    parser.add_argument('--format', nargs='+', choices=sorted(EXPORTERS), default=['html'], dest='formats')
+    parser.add_argument('--workers', type=int, help=f"Worker processes (default: up to {BATCH_MAX_WORKERS})")
+    parser.add_argument('--output', type=Path, help="Zip file to write")
+    args = parser.parse_args()
+    if not db.DB_PATH.exists():
+        parser.error(f"No database at {db.DB_PATH}")
+
+    try:
+        result = export_batch(args.start, args.end, args.period, tuple(args.formats), args.workers, args.output)
+    except ValueError as e:
+        parser.error(str(e))
+
+    print(f"[*] Wrote {len(result.parts)} report(s) to {result.path} in {result.elapsed_seconds:.2f}s")
+    for pid, stats in sorted(result.workers.items()):
+        print(f"    worker {pid}: {stats['reports']} report(s), {stats['busy_seconds']:.2f}s busy")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""
+Command-line tools that work on the database directly, without the dashboard.
+
+stats and export only read, through tracker.db's read-only (mode=ro) pool,
+so they are safe to run from scripts or scheduled tasks while the tracker
+is running. compact and rebuild-rollups rewrite the database and refuse to
+run while a tracker is alive (per workshot.pid). None of the commands start
+the web server; only `track` starts the Windows monitor.
+
+Usage:
+    python -m tracker.cli stats --range week
+    python -m tracker.cli stats --range 2026-09-01..2026-09-30 --json
+    python -m tracker.cli export --format csv --range yesterday --output yesterday.csv
+    python -m tracker.cli compact
+    python -m tracker.cli rebuild-rollups
+    python -m tracker.cli track --headless
+
+`python main.py <command> ...` and `workshot <command> ...` run the same commands.
+"""
+
+import argparse
+import importlib.util
+import json
+import re
+import shutil
+import sys
+from contextlib import nullcontext
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Optional
+
+from . import db
+from .export import EXPORTERS, aggregate_sessions, get_date_range_label, _label_names
+from .instance import hold_lock, running_tracker_pid
+from .utils import format_duration
+
+# The tracker's entry point, next to this package whatever the working directory
+MAIN_SCRIPT = Path(__file__).resolve().parent.parent / "main.py"
+
+RANGE_HELP = "today, yesterday, week, month, all, Nd (last N days), YYYY-MM-DD or YYYY-MM-DD..YYYY-MM-DD"
+
+_LAST_DAYS_RE = re.compile(r'^(\d+)d$')
+
+
+def parse_range(spec: str) -> tuple[Optional[str], Optional[str]]:
+    """
+    Turn a range spec into inclusive (start, end) YYYY-MM-DD dates.
+
+    'week' and 'month' run from the start of the current week (Monday) or
+    month up to today; 'all' returns (None, None).
+    """
+    spec = spec.strip().lower()
+    today = date.today()
+    last_days = _LAST_DAYS_RE.match(spec)
+    if spec == 'all':
+        return None, None
+    if spec == 'today':
+        start = end = today
+    elif spec == 'yesterday':
+        start = end = today - timedelta(days=1)
+    elif spec == 'week':
+        start, end = today - timedelta(days=today.weekday()), today
+    elif spec == 'month':
+        start, end = today.replace(day=1), today
+    elif last_days and int(last_days.group(1)) > 0:
+        start, end = today - timedelta(days=int(last_days.group(1)) - 1), today
+    else:
+        first, _, last = spec.partition('..')
+        try:
+            start = date.fromisoformat(first)
+            end = date.fromisoformat(last) if last else start
+        except ValueError:
+            raise ValueError(f"Invalid range {spec!r}. Use {RANGE_HELP}.") from None
+    if end < start:
+        raise ValueError(f"Range {spec!r} ends before it starts")
+    return start.isoformat(), end.isoformat()
+
+
+def _range_arg(spec: str) -> tuple[Optional[str], Optional[str]]:
+    try:
+        return parse_range(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def _check_database(parser: argparse.ArgumentParser, access: str):
+    """
+    Exit with a usage error if the command cannot run now.
+
+    Every command needs the database. Reads also need it migrated, and
+    maintenance needs the tracker stopped: its open session and rollup
+    folds would race a rebuild, a VACUUM or a WAL truncate.
+    """
+    if not db.DB_PATH.exists():
+        parser.error(f"No database at {db.DB_PATH}")
+    if access == 'maintenance':
+        pid = running_tracker_pid()
+        if pid:
+            parser.error(f"WorkShot is running (PID: {pid}); stop it before running this command")
+        return
+    with db.get_read_db() as conn:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version < db.SCHEMA_VERSION:
+        parser.error(f"Database is at schema v{version} (current: v{db.SCHEMA_VERSION}); "
+                     f"run `rebuild-rollups` or start the tracker once to migrate it")
+
+
+def cmd_stats(args: argparse.Namespace) -> int:
+    start_date, end_date = args.range
+    aggregator = aggregate_sessions(start_date, end_date)
+    label_names = _label_names()
+    apps = aggregator.by_display_name()[:args.top]
+    labels = [
+        {**label, 'name': label_names.get(label['session_label_id'], "General")}
+        for label in aggregator.by_label()
+    ]
+
+    if args.json:
+        print(json.dumps({
+            'start': start_date,
+            'end': end_date,
+            'total_seconds': aggregator.total_seconds,
+            'session_count': aggregator.session_count,
+            'apps': [{k: v for k, v in app.items() if k != 'titles'} for app in apps],
+            'monitors': aggregator.by_monitor(),
+            'labels': labels,
+        }, indent=2))
+        return 0
+
+    total = aggregator.total_seconds or 1
+    print(f"[*] {get_date_range_label(start_date, end_date)}: "
+          f"{format_duration(aggregator.total_seconds)} over {aggregator.session_count:,} sessions")
+    if apps:
+        print("    Apps")
+    for app in apps:
+        print(f"      {format_duration(app['total_seconds']):>12}  {app['total_seconds'] / total:6.1%}  {app['app_name']}")
+    if aggregator.by_monitor():
+        print("    Monitors")
+    for monitor in aggregator.by_monitor():
+        print(f"      {format_duration(monitor['total_seconds']):>12}  {monitor['total_seconds'] / total:6.1%}  "
+              f"Monitor {monitor['monitor']}")
+    if any(label['session_label_id'] is not None for label in labels):
+        print("    Labels")
+        for label in labels:
+            print(f"      {format_duration(label['total_seconds']):>12}  {label['total_seconds'] / total:6.1%}  {label['name']}")
+    return 0
+
+
+def cmd_export(args: argparse.Namespace) -> int:
+    start_date, end_date = args.range
+    path = EXPORTERS[args.format](start_date, end_date)
+    if args.output:
+        shutil.copyfile(path, args.output)
+        path = args.output
+    print(path)
+    return 0
+
+
+def cmd_compact(args: argparse.Namespace) -> int:
+    print("[*] Compacting database..." if args.vacuum else "[*] Optimizing database...")
+    before, after = db.compact_db(vacuum=args.vacuum)
+    print(f"[+] {before / 1e6:.1f} MB -> {after / 1e6:.1f} MB")
+    return 0
+
+
+def cmd_rebuild_rollups(args: argparse.Namespace) -> int:
+    # No orphan recovery here (recover=False): only the tracker closes sessions left open
+    db.init_db()
+    print("[*] Rebuilding daily rollups from session history...")
+    db.rebuild_rollups()
+    print("[+] Rollups rebuilt.")
+    return 0
+
+
+def _load_main_script():
+    """Import MAIN_SCRIPT by path: a plain `import main` depends on the working directory."""
+    module = sys.modules.get("main")
+    if module is not None and Path(module.__file__).resolve() == MAIN_SCRIPT:
+        return module
+    spec = importlib.util.spec_from_file_location("main", MAIN_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["main"] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules["main"]
+        raise
+    return module
+
+
+def cmd_track(args: argparse.Namespace) -> int:
+    # main.py imports the Windows monitor; only this command needs it
+    tracker_main = _load_main_script()
+
+    flags = []
+    if args.headless:
+        flags.append("--no-dashboard")
+    if args.no_browser:
+        flags.append("--no-browser")
+    if args.startup_report:
+        flags.append("--startup-report")
+    tracker_main.main(flags)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="workshot", description="WorkShot command-line tools")
+    commands = parser.add_subparsers(dest='command', required=True, metavar='command')
+
+    stats = commands.add_parser('stats', help="Print tracked time per app, monitor and label")
+    stats.add_argument('--range', type=_range_arg, default='today', help=f"{RANGE_HELP} (default: today)")
+    stats.add_argument('--top', type=int, default=10, help="Apps to list (default: 10)")
+    stats.add_argument('--json', action='store_true', help="Print JSON instead of a table")
+    stats.set_defaults(func=cmd_stats, access='read')
+
+    export = commands.add_parser('export', help="Write a report and print its path")
+    export.add_argument('--format', choices=sorted(EXPORTERS), default='html')
+    export.add_argument('--range', type=_range_arg, default='today', help=f"{RANGE_HELP} (default: today)")
+    export.add_argument('--output', type=Path, help="Copy the report here instead of only leaving it in exports/")
+    export.set_defaults(func=cmd_export, access='read')
+
+    compact = commands.add_parser('compact', help="VACUUM the database, refresh statistics and truncate the WAL")
+    compact.add_argument('--no-vacuum', dest='vacuum', action='store_false', help="Skip VACUUM (fast, no space reclaimed)")
+    compact.set_defaults(func=cmd_compact, access='maintenance')
+
+    rebuild = commands.add_parser('rebuild-rollups', help="Migrate the schema and recompute the daily rollup tables")
+    rebuild.set_defaults(func=cmd_rebuild_rollups, access='maintenance')
+
+    track = commands.add_parser('track', help="Run the tracker (with the dashboard unless --headless)")
+    track.add_argument('--headless', action='store_true', help="Do not start the dashboard or open a browser")
+    track.add_argument('--no-browser', action='store_true', help="Start the dashboard without opening a browser")
+    track.add_argument('--startup-report', action='store_true', help="Print startup timings and time to first sample")
+    track.set_defaults(func=cmd_track, access=None)
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.access is not None:
+        _check_database(parser, args.access)
+    try:
+        # Hold workshot.pid during maintenance so a tracker started meanwhile stops us rather than racing
+        with hold_lock() if args.access == 'maintenance' else nullcontext():
+            return args.func(args)
+    except ValueError as e:
+        print(f"[!] {e}", file=sys.stderr)
+        return 1
+    finally:
+        if args.command != 'track':
+            db.close_connections()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""Coalescing of sub-threshold window switches before they reach the database."""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Optional
+
+
+# Coalescing modes
+ABSORB = 'absorb'   # Flicker time stays with the session that was running
+BUCKET = 'bucket'   # A burst of flickers is recorded as one "Switching" row
+
+
+@dataclass
+class Promotion:
+    """A candidate that held focus long enough to become a real session."""
+    state: Any
+    start_time: datetime
+    # In bucket mode, when the preceding burst of flickers began (None if no bucket row)
+    bucket_start: Optional[datetime] = None
+
+
+class SessionCoalescer:
+    """
+    Sits between window sampling and persistence.
+
+    A sample that differs from the committed session becomes a candidate.
+    The candidate is only promoted to a session once it has held focus for
+    `dwell_seconds`, and its session starts when it was first seen.
+    Candidates that lose focus sooner, such as alt-tab storms or a browser
+    retitling a loading page, are never written. Their time is absorbed into
+    the surrounding session or, in bucket mode, into one short-switches row.
+    """
+
+    def __init__(self, dwell_seconds: float = 2.0, mode: str = ABSORB):
+        if mode not in (ABSORB, BUCKET):
+            raise ValueError(f"Unknown coalescing mode: {mode}")
+        self.dwell_seconds = dwell_seconds
+        self.mode = mode
+        self.pending: Optional[Any] = None
+        self._pending_since: Optional[datetime] = None
+        self._burst_start: Optional[datetime] = None
+        # Counters for stats()
+        self.flickers = 0
+        self.promotions = 0
+        self.bucket_rows = 0
+
+    @property
+    def rows_saved(self) -> int:
+        """Session rows that were never written thanks to coalescing."""
+        return self.flickers - self.bucket_rows
+
+    def reset(self):
+        """Drop any pending candidate (e.g. when the monitor switches to idle)."""
+        if self.pending is not None:
+            self.flickers += 1
+        self.pending = None
+        self._pending_since = None
+        self._burst_start = None
+
+    def observe(self, committed: Optional[Any], sample: Any, now: datetime, force: bool = False) -> Optional[Promotion]:
+        """
+        Feed one window sample. Returns a Promotion when a new session should be opened.
+
+        `force` promotes the sample immediately (first session, label change).
+        """
+        if committed is None or force:
+            self.reset()
+            return self._promote(sample, now, None)
+
+        if sample.matches(committed):
+            # Flicker resolved back to the running session; its time stays there
+            self.reset()
+            return None
+
+        if self.pending is not None and sample.matches(self.pending):
+            if (now - self._pending_since).total_seconds() >= self.dwell_seconds:
+                bucket_start = None
+                if self.mode == BUCKET and self._burst_start < self._pending_since:
+                    bucket_start = self._burst_start
+                    self.bucket_rows += 1
+                promotion = self._promote(self.pending, self._pending_since, bucket_start)
+                self.pending = None
+                self._pending_since = None
+                self._burst_start = None
+                return promotion
+            return None
+
+        # A new candidate; any previous one was a flicker
+        if self.pending is not None:
+            self.flickers += 1
+        self.pending = sample
+        self._pending_since = now
+        if self._burst_start is None:
+            self._burst_start = now
+        if self.dwell_seconds <= 0:
+            return self.observe(committed, sample, now)
+        return None
+
+    def _promote(self, state: Any, start_time: datetime, bucket_start: Optional[datetime]) -> Promotion:
+        self.promotions += 1
+        return Promotion(state=state, start_time=start_time, bucket_start=bucket_start)
+
+    def stats(self) -> dict:
+        """Coalescing figures for diagnostics."""
+        return {
+            'mode': self.mode,
+            'dwell_seconds': self.dwell_seconds,
+            'promotions': self.promotions,
+            'flickers': self.flickers,
+            'bucket_rows': self.bucket_rows,
+            'rows_saved': self.rows_saved,
+        }
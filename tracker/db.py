@@ -1,34 +1,236 @@
 """SQLite database operations for activity tracking."""
 
+import queue
 import sqlite3
-from datetime import datetime
+import threading
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Optional
 from contextlib import contextmanager
 
+from .utils import to_epoch_ms, from_epoch_ms, get_today_range
+
 # Database file location
 DB_PATH = Path(__file__).parent.parent / "workshot.db"
 
+# Connection tuning, applied once when each long-lived connection is opened
+PRAGMAS = {
+    'synchronous': 'NORMAL',     # Safe with WAL, avoids an fsync per commit
+    'cache_size': -16000,        # ~16 MB page cache per connection
+    'mmap_size': 268435456,      # 256 MB memory-mapped reads
+    'temp_store': 'MEMORY',
+}
+READER_POOL_SIZE = 4
+# How long to wait for a pooled reader before opening a temporary one
+READER_WAIT_SECONDS = 1.0
+BUSY_TIMEOUT_SECONDS = 5.0
+# sqlite3 keeps compiled statements per connection; long-lived connections reuse them
+STATEMENT_CACHE_SIZE = 256
+
+# Schema version stored in PRAGMA user_version (see MIGRATIONS below)
+SCHEMA_VERSION = 4
+MIGRATION_CHUNK_SIZE = 5000
+
+
+# Incremented after every committed write; readers use it to tell whether cached results are stale
+_generation = 0
+_generation_lock = threading.Lock()
+
+
+def bump_generation() -> int:
+    """Mark the data as changed (called after each committed write)."""
+    global _generation
+    with _generation_lock:
+        _generation += 1
+        return _generation
+
+
+def get_generation() -> int:
+    """Current data generation; equal values mean no write was committed in between."""
+    return _generation
+
+
+# Rows touched by heartbeat checkpoints in the open write transaction (writer lock held).
+# A heartbeat only refreshes the open session's checkpoint, which readers get live from
+# TodayModel, so a commit made of nothing else leaves the generation alone.
+_heartbeat_changes = 0
+
+
+def _count_heartbeat_changes(rows: int):
+    global _heartbeat_changes
+    _heartbeat_changes += rows
+
+
+def _take_heartbeat_changes() -> int:
+    global _heartbeat_changes
+    rows, _heartbeat_changes = _heartbeat_changes, 0
+    return rows
+
+
+class ConnectionManager:
+    """
+    One long-lived writer connection plus a small pool of read-only readers.
+
+    The database runs in WAL mode so the dashboard can read while the monitor
+    writes. All writes are serialized through the writer lock.
+    """
+
+    def __init__(self, db_path: Path, pool_size: int = READER_POOL_SIZE):
+        self.db_path = db_path
+        self.pool_size = pool_size
+        self._writer: Optional[sqlite3.Connection] = None
+        self._writer_lock = threading.RLock()
+        self._writer_depth = 0
+        self._readers: queue.LifoQueue = queue.LifoQueue()
+        self._reader_count = 0
+        self._readers_lock = threading.Lock()
+        self._all_readers: list[sqlite3.Connection] = []
+
+    def _connect(self, readonly: bool) -> sqlite3.Connection:
+        """Open and tune a connection."""
+        if readonly:
+            conn = sqlite3.connect(
+                f"file:{self.db_path.as_posix()}?mode=ro", uri=True,
+                check_same_thread=False, timeout=BUSY_TIMEOUT_SECONDS,
+                cached_statements=STATEMENT_CACHE_SIZE
+            )
+        else:
+            conn = sqlite3.connect(
+                str(self.db_path), check_same_thread=False,
+                timeout=BUSY_TIMEOUT_SECONDS, cached_statements=STATEMENT_CACHE_SIZE
+            )
+            conn.execute("PRAGMA journal_mode = WAL")
+        for name, value in PRAGMAS.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @contextmanager
+    def writer(self):
+        """Exclusive access to the writer connection; commits when the outermost block exits."""
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = self._connect(readonly=False)
+            self._writer_depth += 1
+            if self._writer_depth == 1:
+                changes_before = self._writer.total_changes
+                _take_heartbeat_changes()
+            try:
+                yield self._writer
+                if self._writer_depth == 1:
+                    self._writer.commit()
+                    changes = self._writer.total_changes - changes_before
+                    if changes > _take_heartbeat_changes():
+                        bump_generation()
+            except BaseException:
+                if self._writer_depth == 1:
+                    self._writer.rollback()
+                    _take_heartbeat_changes()
+                raise
+            finally:
+                self._writer_depth -= 1
+
+    @contextmanager
+    def reader(self):
+        """Borrow a read-only connection from the pool (or a temporary one if it stays exhausted)."""
+        conn, pooled = self._acquire_reader()
+        try:
+            yield conn
+        finally:
+            if pooled:
+                self._readers.put(conn)
+            else:
+                conn.close()
+
+    def _acquire_reader(self) -> tuple[sqlite3.Connection, bool]:
+        """
+        Return (connection, pooled).
+
+        Opens pooled readers up to pool_size; once they are all busy, waits
+        READER_WAIT_SECONDS for one to come back, then opens a temporary
+        connection instead, so slow readers can never starve everyone else.
+        """
+        try:
+            return self._readers.get_nowait(), True
+        except queue.Empty:
+            pass
+        with self._readers_lock:
+            if self._reader_count < self.pool_size:
+                conn = self._connect(readonly=True)
+                self._reader_count += 1
+                self._all_readers.append(conn)
+                return conn, True
+        try:
+            return self._readers.get(timeout=READER_WAIT_SECONDS), True
+        except queue.Empty:
+            return self._connect(readonly=True), False
+
+    def close(self):
+        """Close every connection held by the manager."""
+        with self._writer_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+        with self._readers_lock:
+            for conn in self._all_readers:
+                conn.close()
+            self._all_readers.clear()
+            self._reader_count = 0
+            self._readers = queue.LifoQueue()
+
+
+_manager: Optional[ConnectionManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_manager() -> ConnectionManager:
+    """Get the process-wide connection manager for DB_PATH."""
+    global _manager
+    with _manager_lock:
+        if _manager is None or _manager.db_path != DB_PATH:
+            if _manager is not None:
+                _manager.close()
+            _manager = ConnectionManager(DB_PATH)
+        return _manager
+
+
+def close_connections():
+    """Close pooled connections (call on shutdown)."""
+    global _manager
+    with _manager_lock:
+        if _manager is not None:
+            _manager.close()
+            _manager = None
+
 
 def get_connection() -> sqlite3.Connection:
-    """Get database connection with row factory."""
-    conn = sqlite3.connect(str(DB_PATH), check_same_thread=False)
+    """Get a standalone database connection with row factory (caller closes it)."""
+    conn = sqlite3.connect(str(DB_PATH), check_same_thread=False, timeout=BUSY_TIMEOUT_SECONDS)
     conn.row_factory = sqlite3.Row
     return conn
 
 
 @contextmanager
 def get_db():
-    """Context manager for database connections."""
-    conn = get_connection()
-    try:
+    """Context manager for the shared writer connection (commits on exit)."""
+    with get_manager().writer() as conn:
+        yield conn
+
+
+@contextmanager
+def get_read_db():
+    """Context manager for a pooled read-only connection."""
+    with get_manager().reader() as conn:
         yield conn
-        conn.commit()
-    finally:
-        conn.close()
 
-def init_db():
-    """Initialize and upgrade database tables."""
+def init_db(recover: bool = False):
+    """
+    Initialize and upgrade database tables.
+
+    Only the tracker passes `recover=True`, once it holds the single-instance
+    lock: to any other process a running tracker's open session looks
+    orphaned, and closing it there would lose that session's time.
+    """
     with get_db() as conn:
         cursor = conn.cursor()
         
@@ -54,7 +256,10 @@ def init_db():
                 end_time DATETIME,
                 duration_seconds INTEGER DEFAULT 0,
                 is_idle INTEGER DEFAULT 0,
-                session_label_id INTEGER REFERENCES session_labels(id)
+                session_label_id INTEGER REFERENCES session_labels(id),
+                start_ms INTEGER,
+                end_ms INTEGER,
+                heartbeat_ms INTEGER
             )
         """)
         
@@ -71,75 +276,433 @@ def init_db():
         except sqlite3.OperationalError: pass
 
         # 3. Indices for performance
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessions_start_time ON sessions(start_time)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_label_id ON sessions(session_label_id)")
         
         conn.commit()
+        
+        # 4. Versioned migrations
+        run_migrations(conn)
+        
+        # 5. Close sessions left open by a crash, using their last heartbeat
+        if recover:
+            recover_orphaned_sessions(conn)
+
+
+# SQL expression converting a naive local DATETIME string column to epoch milliseconds
+_EPOCH_MS_SQL = "CAST(ROUND((julianday({col}, 'utc') - 2440587.5) * 86400000) AS INTEGER)"
+
+
+def _migrate_epoch_columns(conn: sqlite3.Connection):
+    """v1: add integer epoch-ms columns, backfill them in chunks, index start_ms."""
+    cursor = conn.cursor()
+    for column in ('start_ms', 'end_ms'):
+        try:
+            cursor.execute(f"ALTER TABLE sessions ADD COLUMN {column} INTEGER")
+        except sqlite3.OperationalError: pass
+    
+    # Stream the backfill by primary-key ranges so large databases never load into memory
+    cursor.execute("SELECT COALESCE(MAX(id), 0) FROM sessions")
+    max_id = cursor.fetchone()[0]
+    for low in range(0, max_id, MIGRATION_CHUNK_SIZE):
+        cursor.execute(f"""
+            UPDATE sessions
+            SET start_ms = {_EPOCH_MS_SQL.format(col='start_time')},
+                end_ms = CASE WHEN end_time IS NULL THEN NULL ELSE {_EPOCH_MS_SQL.format(col='end_time')} END
+            WHERE id > ? AND id <= ? AND start_ms IS NULL
+        """, (low, low + MIGRATION_CHUNK_SIZE))
+        conn.commit()
+    
+    cursor.execute("DROP INDEX IF EXISTS idx_sessions_start_time")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessions_start_ms ON sessions(start_ms)")
+
+
+def _migrate_rollup_tables(conn: sqlite3.Connection):
+    """v2: create the daily rollup tables and backfill them from existing sessions."""
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS rollup_app (
+            day TEXT NOT NULL,
+            app_name TEXT NOT NULL,
+            is_idle INTEGER NOT NULL DEFAULT 0,
+            total_seconds INTEGER NOT NULL DEFAULT 0,
+            session_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, app_name, is_idle)
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS rollup_monitor (
+            day TEXT NOT NULL,
+            monitor INTEGER NOT NULL,
+            total_seconds INTEGER NOT NULL DEFAULT 0,
+            session_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, monitor)
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS rollup_label (
+            day TEXT NOT NULL,
+            session_label_id INTEGER NOT NULL,
+            total_seconds INTEGER NOT NULL DEFAULT 0,
+            session_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, session_label_id)
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS rollup_hour (
+            day TEXT NOT NULL,
+            hour INTEGER NOT NULL,
+            active_seconds INTEGER NOT NULL DEFAULT 0,
+            idle_seconds INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, hour)
+        )
+    """)
+    conn.commit()
+    _rebuild_rollups(conn)
+
+
+def _migrate_heartbeat(conn: sqlite3.Connection):
+    """v3: heartbeat column for open sessions plus a partial index over open rows."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute("ALTER TABLE sessions ADD COLUMN heartbeat_ms INTEGER")
+    except sqlite3.OperationalError: pass
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessions_open ON sessions(id) WHERE end_ms IS NULL")
+
+
+def _migrate_upload_queue(conn: sqlite3.Connection):
+    """v4: durable queue of files waiting to be uploaded (see tracker.uploads)."""
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS upload_queue (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            path TEXT NOT NULL,
+            folder TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_ms INTEGER NOT NULL,
+            last_error TEXT,
+            created_ms INTEGER NOT NULL,
+            updated_ms INTEGER NOT NULL
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_upload_queue_due ON upload_queue(status, next_attempt_ms)")
+
+
+# (version, migration) pairs, applied in order to databases below that version
+MIGRATIONS = [
+    (1, _migrate_epoch_columns),
+    (2, _migrate_rollup_tables),
+    (3, _migrate_heartbeat),
+    (4, _migrate_upload_queue),
+]
+
+
+def run_migrations(conn: sqlite3.Connection):
+    """Apply pending schema migrations, recording progress in PRAGMA user_version."""
+    current = conn.execute("PRAGMA user_version").fetchone()[0]
+    for version, migrate in MIGRATIONS:
+        if version <= current:
+            continue
+        print(f"[*] Migrating database to schema v{version}...")
+        migrate(conn)
+        conn.execute(f"PRAGMA user_version = {version}")
+        conn.commit()
+
+
+# --- Daily rollups ---
+# Closed sessions are folded into per-day tables keyed by app, monitor, label and hour.
+# Day-keyed tables attribute a session to the local day it started on (matching the
+# raw queries); the hourly table splits a session's duration across the hours it spans.
+
+ROLLUP_TABLES = ('rollup_app', 'rollup_monitor', 'rollup_label', 'rollup_hour')
+
+_UPSERT_APP = """
+    INSERT INTO rollup_app (day, app_name, is_idle, total_seconds, session_count) VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(day, app_name, is_idle) DO UPDATE SET
+        total_seconds = total_seconds + excluded.total_seconds,
+        session_count = session_count + excluded.session_count
+"""
+_UPSERT_MONITOR = """
+    INSERT INTO rollup_monitor (day, monitor, total_seconds, session_count) VALUES (?, ?, ?, ?)
+    ON CONFLICT(day, monitor) DO UPDATE SET
+        total_seconds = total_seconds + excluded.total_seconds,
+        session_count = session_count + excluded.session_count
+"""
+_UPSERT_LABEL = """
+    INSERT INTO rollup_label (day, session_label_id, total_seconds, session_count) VALUES (?, ?, ?, ?)
+    ON CONFLICT(day, session_label_id) DO UPDATE SET
+        total_seconds = total_seconds + excluded.total_seconds,
+        session_count = session_count + excluded.session_count
+"""
+_UPSERT_HOUR = """
+    INSERT INTO rollup_hour (day, hour, active_seconds, idle_seconds) VALUES (?, ?, ?, ?)
+    ON CONFLICT(day, hour) DO UPDATE SET
+        active_seconds = active_seconds + excluded.active_seconds,
+        idle_seconds = idle_seconds + excluded.idle_seconds
+"""
+
+_ROLLUP_COLUMNS = "app_name, monitor, COALESCE(is_idle, 0) AS is_idle, COALESCE(session_label_id, 0) AS session_label_id, start_ms, duration_seconds"
+
+
+class _RollupBatch:
+    """Accumulates rollup deltas for one or more closed sessions, then upserts them."""
+
+    def __init__(self):
+        self.app: dict = {}
+        self.monitor: dict = {}
+        self.label: dict = {}
+        self.hour: dict = {}
+
+    @staticmethod
+    def _bump(table: dict, key: tuple, seconds: int, count: int):
+        total = table.get(key, (0, 0))
+        table[key] = (total[0] + seconds, total[1] + count)
+
+    def add(self, row):
+        """Fold one closed session row into the pending deltas."""
+        duration = row['duration_seconds'] or 0
+        if duration <= 0 or row['start_ms'] is None:
+            return
+        start = from_epoch_ms(row['start_ms'])
+        day = start.strftime("%Y-%m-%d")
+        is_idle = 1 if row['is_idle'] else 0
+        
+        self._bump(self.app, (day, row['app_name'], is_idle), duration, 1)
+        if not is_idle:
+            if row['monitor'] and row['monitor'] > 0:
+                self._bump(self.monitor, (day, row['monitor']), duration, 1)
+            self._bump(self.label, (day, row['session_label_id'] or 0), duration, 1)
+        
+        # Split the duration across the hour buckets it covers
+        remaining = duration
+        cursor_time = start
+        while remaining > 0:
+            hour_start = cursor_time.replace(minute=0, second=0, microsecond=0)
+            seconds_left_in_hour = 3600 - int((cursor_time - hour_start).total_seconds())
+            chunk = min(remaining, max(seconds_left_in_hour, 1))
+            key = (cursor_time.strftime("%Y-%m-%d"), cursor_time.hour)
+            active, idle = self.hour.get(key, (0, 0))
+            self.hour[key] = (active, idle + chunk) if is_idle else (active + chunk, idle)
+            remaining -= chunk
+            cursor_time = hour_start + timedelta(hours=1)
+
+    def flush(self, cursor: sqlite3.Cursor):
+        """Write accumulated deltas and reset."""
+        cursor.executemany(_UPSERT_APP, [(*k, *v) for k, v in self.app.items()])
+        cursor.executemany(_UPSERT_MONITOR, [(*k, *v) for k, v in self.monitor.items()])
+        cursor.executemany(_UPSERT_LABEL, [(*k, *v) for k, v in self.label.items()])
+        cursor.executemany(_UPSERT_HOUR, [(*k, *v) for k, v in self.hour.items()])
+        for table in (self.app, self.monitor, self.label, self.hour):
+            table.clear()
+
+
+def _apply_session_rollups(cursor: sqlite3.Cursor, session_id: int):
+    """Fold a just-closed session into the rollup tables (same transaction as the close)."""
+    cursor.execute(f"SELECT {_ROLLUP_COLUMNS} FROM sessions WHERE id = ?", (session_id,))
+    row = cursor.fetchone()
+    if row:
+        batch = _RollupBatch()
+        batch.add(row)
+        batch.flush(cursor)
+
+
+def _rebuild_rollups(conn: sqlite3.Connection):
+    """
+    Recompute every rollup table from closed sessions, streaming by primary-key chunks.
+
+    Nothing is committed here: the caller commits once, so readers never see
+    emptied or half-rebuilt rollups.
+    """
+    cursor = conn.cursor()
+    for table in ROLLUP_TABLES:
+        cursor.execute(f"DELETE FROM {table}")
+    
+    cursor.execute("SELECT COALESCE(MAX(id), 0) FROM sessions")
+    max_id = cursor.fetchone()[0]
+    batch = _RollupBatch()
+    for low in range(0, max_id, MIGRATION_CHUNK_SIZE):
+        cursor.execute(f"""
+            SELECT {_ROLLUP_COLUMNS} FROM sessions
+            WHERE id > ? AND id <= ? AND end_ms IS NOT NULL
+        """, (low, low + MIGRATION_CHUNK_SIZE))
+        for row in cursor.fetchall():
+            batch.add(row)
+        batch.flush(cursor)
+
+
+def rebuild_rollups():
+    """Rebuild the daily rollup tables from the full session history in one transaction."""
+    with get_db() as conn:
+        # Take the write lock before the DELETE so no session close is folded in mid-rebuild
+        conn.execute("BEGIN IMMEDIATE")
+        _rebuild_rollups(conn)
+
+
+def _storage_bytes() -> int:
+    """Size of the database file plus its write-ahead log."""
+    wal = DB_PATH.with_name(DB_PATH.name + "-wal")
+    return sum(path.stat().st_size for path in (DB_PATH, wal) if path.exists())
+
+
+def compact_db(vacuum: bool = True) -> tuple[int, int]:
+    """
+    Reclaim space and refresh query planner statistics.
+
+    Runs PRAGMA optimize, then (unless `vacuum` is False) VACUUM to rebuild
+    the file without free pages, and finally truncates the WAL. Waits up to
+    BUSY_TIMEOUT_SECONDS for a running tracker's writes. Returns the
+    database + WAL size in bytes before and after.
+    """
+    before = _storage_bytes()
+    with get_db() as conn:
+        conn.execute("PRAGMA optimize")
+        if vacuum:
+            conn.execute("VACUUM")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    return before, _storage_bytes()
 
 
 def start_session(app_name: str, window_title: str, monitor: int, is_idle: bool = False, session_label_id: Optional[int] = None) -> int:
     """Start a new activity session. Returns session ID."""
     with get_db() as conn:
         cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO sessions (app_name, window_title, monitor, start_time, is_idle, session_label_id)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (app_name, window_title, monitor, datetime.now(), 1 if is_idle else 0, session_label_id if session_label_id is not None else None))
-        return cursor.lastrowid
+        return insert_session(cursor, None, app_name, window_title, monitor, datetime.now(), is_idle, session_label_id)
 
 
 def end_session(session_id: int):
     """End an activity session and calculate duration."""
+    with get_db() as conn:
+        close_session(conn.cursor(), session_id, datetime.now())
+
+
+def close_session(cursor: sqlite3.Cursor, session_id: int, end_time: datetime):
+    """Close an open session row on a cursor and fold it into the daily rollups."""
+    end_ms = to_epoch_ms(end_time)
+    cursor.execute("""
+        UPDATE sessions 
+        SET end_time = ?, end_ms = ?,
+            duration_seconds = MAX(0, (? - start_ms) / 1000)
+        WHERE id = ? AND end_ms IS NULL
+    """, (end_time, end_ms, end_ms, session_id))
+    if cursor.rowcount == 1:
+        _apply_session_rollups(cursor, session_id)
+
+
+def heartbeat_session(cursor: sqlite3.Cursor, session_id: int, at: datetime):
+    """Checkpoint an open session's progress so a crash loses at most one heartbeat interval."""
+    at_ms = to_epoch_ms(at)
+    cursor.execute("""
+        UPDATE sessions 
+        SET heartbeat_ms = ?, duration_seconds = MAX(0, (? - start_ms) / 1000)
+        WHERE id = ? AND end_ms IS NULL
+    """, (at_ms, at_ms, session_id))
+    _count_heartbeat_changes(cursor.rowcount)
+
+
+def recover_orphaned_sessions(conn: sqlite3.Connection) -> int:
+    """
+    Close sessions left open by a process that died without shutting down.
+    
+    Each orphan ends at its last heartbeat (or its start if it never had one).
+    The partial index on open rows keeps this from scanning the table.
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT id, COALESCE(heartbeat_ms, start_ms) AS last_seen_ms
+        FROM sessions WHERE end_ms IS NULL
+    """)
+    orphans = cursor.fetchall()
+    for row in orphans:
+        close_session(cursor, row['id'], from_epoch_ms(row['last_seen_ms']))
+    if orphans:
+        conn.commit()
+        print(f"[*] Recovered {len(orphans)} session(s) left open by an unclean shutdown.")
+    return len(orphans)
+
+
+def insert_session(
+    cursor: sqlite3.Cursor,
+    session_id: Optional[int],
+    app_name: str,
+    window_title: str,
+    monitor: int,
+    start_time: datetime,
+    is_idle: bool = False,
+    session_label_id: Optional[int] = None
+) -> int:
+    """Insert a session row on an open cursor. Pass session_id=None to let SQLite pick it."""
+    cursor.execute("""
+        INSERT INTO sessions (id, app_name, window_title, monitor, start_time, start_ms, is_idle, session_label_id)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, (session_id, app_name, window_title, monitor, start_time, to_epoch_ms(start_time), 1 if is_idle else 0, session_label_id))
+    return cursor.lastrowid
+
+
+def switch_session(
+    old_session_id: Optional[int],
+    app_name: str,
+    window_title: str,
+    monitor: int,
+    is_idle: bool = False,
+    session_label_id: Optional[int] = None,
+    at: Optional[datetime] = None
+) -> int:
+    """Atomically end the old session and start a new one in a single transaction. Returns new session ID."""
+    at = at or datetime.now()
     with get_db() as conn:
         cursor = conn.cursor()
-        now = datetime.now()
-        
-        # Get start time to calculate duration
-        cursor.execute("SELECT start_time FROM sessions WHERE id = ?", (session_id,))
-        row = cursor.fetchone()
-        
-        if row:
-            start_time = datetime.fromisoformat(row['start_time'])
-            duration = int((now - start_time).total_seconds())
-            
-            cursor.execute("""
-                UPDATE sessions 
-                SET end_time = ?, duration_seconds = ?
-                WHERE id = ?
-            """, (now, duration, session_id))
+        if old_session_id:
+            close_session(cursor, old_session_id, at)
+        return insert_session(cursor, None, app_name, window_title, monitor, at, is_idle, session_label_id)
+
+
+def get_max_session_id() -> int:
+    """Highest session ID ever handed out (respects AUTOINCREMENT history)."""
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM sessions")
+        max_id = cursor.fetchone()[0]
+        cursor.execute("SELECT COALESCE(MAX(seq), 0) FROM sqlite_sequence WHERE name = 'sessions'")
+        return max(max_id, cursor.fetchone()[0])
+
+
+def _today_range_ms() -> tuple[int, int]:
+    """Half-open [midnight, next midnight) bounds for today in epoch ms."""
+    today, tomorrow = get_today_range()
+    return to_epoch_ms(today), to_epoch_ms(tomorrow)
 
 
 def get_today_sessions() -> list[dict]:
     """Get all sessions from today."""
-    with get_db() as conn:
+    with get_read_db() as conn:
         cursor = conn.cursor()
-        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        day_start, day_end = _today_range_ms()
         
         cursor.execute("""
             SELECT * FROM sessions 
-            WHERE start_time >= ?
-            ORDER BY start_time DESC
-        """, (today,))
+            WHERE start_ms >= ? AND start_ms < ?
+            ORDER BY start_ms DESC
+        """, (day_start, day_end))
         
         return [dict(row) for row in cursor.fetchall()]
 
 
 def get_today_summary(include_idle: bool = False) -> list[dict]:
-    """Get aggregated time per app for today."""
-    with get_db() as conn:
+    """Get aggregated time per app for today (from the daily rollups)."""
+    with get_read_db() as conn:
         cursor = conn.cursor()
-        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        today = datetime.now().strftime("%Y-%m-%d")
         
         # Exclude idle sessions from app summary unless specified
-        idle_filter = "" if include_idle else "AND (is_idle = 0 OR is_idle IS NULL)"
+        idle_filter = "" if include_idle else "AND is_idle = 0"
         
         cursor.execute(f"""
             SELECT 
                 app_name,
-                SUM(duration_seconds) as total_seconds,
-                COUNT(*) as session_count
-            FROM sessions 
-            WHERE start_time >= ? AND duration_seconds > 0 {idle_filter}
+                SUM(total_seconds) as total_seconds,
+                SUM(session_count) as session_count
+            FROM rollup_app 
+            WHERE day = ? {idle_filter}
             GROUP BY app_name
             ORDER BY total_seconds DESC
         """, (today,))
@@ -147,21 +710,27 @@ def get_today_summary(include_idle: bool = False) -> list[dict]:
         return [dict(row) for row in cursor.fetchall()]
 
 
+def get_app_rollups(day: str) -> list[dict]:
+    """Get the raw per-(app, is_idle) rollup rows for a day (YYYY-MM-DD)."""
+    with get_read_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT app_name, is_idle, total_seconds, session_count
+            FROM rollup_app WHERE day = ?
+        """, (day,))
+        return [dict(row) for row in cursor.fetchall()]
+
+
 def get_monitor_breakdown() -> list[dict]:
     """Get time breakdown by monitor for today (excludes idle sessions)."""
-    with get_db() as conn:
+    with get_read_db() as conn:
         cursor = conn.cursor()
-        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        today = datetime.now().strftime("%Y-%m-%d")
         
         cursor.execute("""
-            SELECT 
-                monitor,
-                SUM(duration_seconds) as total_seconds,
-                COUNT(*) as session_count
-            FROM sessions 
-            WHERE start_time >= ? AND duration_seconds > 0 
-                AND (is_idle = 0 OR is_idle IS NULL) AND monitor > 0
-            GROUP BY monitor
+            SELECT monitor, total_seconds, session_count
+            FROM rollup_monitor 
+            WHERE day = ? AND monitor > 0
             ORDER BY monitor
         """, (today,))
         
@@ -170,14 +739,14 @@ def get_monitor_breakdown() -> list[dict]:
 
 def get_today_idle_time() -> int:
     """Get total idle time for today in seconds."""
-    with get_db() as conn:
+    with get_read_db() as conn:
         cursor = conn.cursor()
-        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        today = datetime.now().strftime("%Y-%m-%d")
         
         cursor.execute("""
-            SELECT COALESCE(SUM(duration_seconds), 0) as total_idle
-            FROM sessions 
-            WHERE start_time >= ? AND is_idle = 1
+            SELECT COALESCE(SUM(total_seconds), 0) as total_idle
+            FROM rollup_app 
+            WHERE day = ? AND is_idle = 1
         """, (today,))
         
         row = cursor.fetchone()
@@ -186,14 +755,14 @@ def get_today_idle_time() -> int:
 
 def get_recent_sessions(limit: int = 20) -> list[dict]:
     """Get most recent sessions (includes idle sessions)."""
-    with get_db() as conn:
+    with get_read_db() as conn:
         cursor = conn.cursor()
         
         cursor.execute("""
             SELECT id, app_name, window_title, monitor, start_time, 
                    end_time, duration_seconds, COALESCE(is_idle, 0) as is_idle
             FROM sessions 
-            ORDER BY start_time DESC
+            ORDER BY start_ms DESC
             LIMIT ?
         """, (limit,))
         
@@ -202,13 +771,13 @@ def get_recent_sessions(limit: int = 20) -> list[dict]:
 
 def get_current_session() -> Optional[dict]:
     """Get the currently active (unclosed) session."""
-    with get_db() as conn:
+    with get_read_db() as conn:
         cursor = conn.cursor()
         
         cursor.execute("""
             SELECT * FROM sessions 
-            WHERE end_time IS NULL
-            ORDER BY start_time DESC
+            WHERE end_ms IS NULL
+            ORDER BY start_ms DESC
             LIMIT 1
         """)
         
@@ -218,13 +787,17 @@ def get_current_session() -> Optional[dict]:
 # FUTURE REFERENCE: when want to sort sessions by label, we can use this.
 # Bulk assign a label to all sessions in a time range.
 def assign_label_to_range(start_time: datetime, end_time: datetime, label_id: int):
-    """Bulk assign a label to all sessions in a time range."""
+    """
+    Bulk assign a label to all sessions starting in [start_time, end_time).
+    
+    Note: rollup_label is not adjusted here; call rebuild_rollups() afterwards.
+    """
     with get_db() as conn:
         cursor = conn.cursor()
         cursor.execute("""
             UPDATE sessions 
             SET session_label_id = ? 
-            WHERE start_time >= ? AND start_time <= ?
-        """, (label_id, start_time, end_time))
+            WHERE start_ms >= ? AND start_ms < ?
+        """, (label_id, to_epoch_ms(start_time), to_epoch_ms(end_time)))
 
 
@@ -0,0 +1,43 @@
+"""The workshot.pid lock file that marks a running tracker."""
+
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+import psutil
+
+# Written by the tracker at startup (see main.manage_single_instance)
+LOCK_FILE = Path(__file__).parent.parent / "workshot.pid"
+
+
+def running_tracker_pid() -> Optional[int]:
+    """PID of a live tracker recorded in LOCK_FILE, or None (ignores this process)."""
+    try:
+        pid = int(LOCK_FILE.read_text().strip())
+    except (OSError, ValueError):
+        return None
+    if pid == os.getpid() or not psutil.pid_exists(pid):
+        return None
+    return pid
+
+
+@contextmanager
+def hold_lock():
+    """
+    Record this process in LOCK_FILE while the block runs.
+
+    A tracker starting meanwhile stops this process (see
+    main.manage_single_instance) instead of writing alongside it. The file
+    is removed afterwards only if it still names this process.
+    """
+    pid = str(os.getpid())
+    LOCK_FILE.write_text(pid)
+    try:
+        yield
+    finally:
+        try:
+            if LOCK_FILE.read_text().strip() == pid:
+                LOCK_FILE.unlink()
+        except OSError:
+            pass
@@ -0,0 +1,238 @@
+"""In-memory model of today's activity, kept current by the monitor thread."""
+
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Optional
+
+from . import db
+from .utils import to_epoch_ms
+
+
+class TodayModel:
+    """
+    Today's per-app, per-monitor and idle counters plus a ring buffer of recent sessions.
+
+    The monitor reports every session boundary, so reads never touch SQLite.
+    Totals include the elapsed time of the still-open session. Sessions are
+    attributed to the day they started on, matching the database rollups.
+    """
+
+    def __init__(self, recent_limit: int = 50):
+        self.recent_limit = recent_limit
+        self._lock = threading.Lock()
+        self._day: Optional[str] = None
+        self._apps: dict[tuple[str, bool], list[int]] = {}   # (app_name, is_idle) -> [seconds, count]
+        self._monitors: dict[int, list[int]] = {}            # monitor -> [seconds, count]
+        self._recent: deque = deque(maxlen=recent_limit)
+        self._open: Optional[dict] = None
+        self.loaded = False
+
+    def load(self):
+        """Rebuild today's counters and the recent-session buffer from the database."""
+        today = datetime.now().strftime("%Y-%m-%d")
+        app_rollups = db.get_app_rollups(today)
+        monitors = db.get_monitor_breakdown()
+        recent = db.get_recent_sessions(self.recent_limit)
+
+        with self._lock:
+            self._day = today
+            self._apps = {
+                (r['app_name'], bool(r['is_idle'])): [r['total_seconds'], r['session_count']]
+                for r in app_rollups
+            }
+            self._monitors = {m['monitor']: [m['total_seconds'], m['session_count']] for m in monitors}
+            # Open rows left over from a previous run are not ours to extend
+            self._recent = deque(
+                (s for s in reversed(recent) if s['end_time'] is not None),
+                maxlen=self.recent_limit
+            )
+            self.loaded = True
+
+    def _roll_day(self, now: datetime):
+        """Reset counters when the local day changes (call with the lock held)."""
+        day = now.strftime("%Y-%m-%d")
+        if day != self._day:
+            self._day = day
+            self._apps = {}
+            self._monitors = {}
+
+    def session_switched(
+        self,
+        old_session_id: Optional[int],
+        session_id: int,
+        app_name: str,
+        window_title: str,
+        monitor: int,
+        at: datetime,
+        is_idle: bool = False,
+        session_label_id: Optional[int] = None
+    ) -> Optional[dict]:
+        """
+        Record the close of the current session (if any) and the start of a new one.
+
+        Returns the closed session row, or None.
+        """
+        closed = None
+        with self._lock:
+            if old_session_id and self._open and self._open['id'] == old_session_id:
+                closed = self._close_open(at)
+            self._roll_day(at)
+            self._open = {
+                'id': session_id,
+                'app_name': app_name,
+                'window_title': window_title,
+                'monitor': monitor,
+                'start_time': str(at),
+                'end_time': None,
+                'duration_seconds': 0,
+                'is_idle': 1 if is_idle else 0,
+                'session_label_id': session_label_id,
+                '_start': at,
+            }
+        return closed
+
+    def session_ended(self, session_id: int, at: datetime) -> Optional[dict]:
+        """Record the close of the current session without a successor. Returns the closed row."""
+        with self._lock:
+            if self._open and self._open['id'] == session_id:
+                return self._close_open(at)
+        return None
+
+    def _close_open(self, at: datetime) -> dict:
+        """Fold the open session into the counters and return a copy of it (lock held)."""
+        session = self._open
+        self._open = None
+        start = session.pop('_start')
+        # Same arithmetic as db.close_session so memory and disk agree
+        duration = max(0, (to_epoch_ms(at) - to_epoch_ms(start)) // 1000)
+        session['end_time'] = str(at)
+        session['duration_seconds'] = duration
+        self._recent.append(session)
+
+        self._roll_day(at)
+        if duration > 0 and start.strftime("%Y-%m-%d") == self._day:
+            self._add(session, duration, 1)
+        return dict(session)
+
+    def _add(self, session: dict, seconds: int, count: int):
+        """Add seconds/count for a session to the app and monitor counters."""
+        is_idle = bool(session['is_idle'])
+        app = self._apps.setdefault((session['app_name'], is_idle), [0, 0])
+        app[0] += seconds
+        app[1] += count
+        if not is_idle and session['monitor'] > 0:
+            mon = self._monitors.setdefault(session['monitor'], [0, 0])
+            mon[0] += seconds
+            mon[1] += count
+
+    def _snapshot(self, include_open: bool = True) -> tuple[dict, dict]:
+        """Copy the counters, by default with the open session's elapsed time folded in (lock held)."""
+        now = datetime.now()
+        self._roll_day(now)
+        apps = {k: list(v) for k, v in self._apps.items()}
+        monitors = {k: list(v) for k, v in self._monitors.items()}
+        session = self._open
+        if include_open and session and session['_start'].strftime("%Y-%m-%d") == self._day:
+            elapsed = int((now - session['_start']).total_seconds())
+            if elapsed > 0:
+                is_idle = bool(session['is_idle'])
+                app = apps.setdefault((session['app_name'], is_idle), [0, 0])
+                app[0] += elapsed
+                app[1] += 1
+                if not is_idle and session['monitor'] > 0:
+                    mon = monitors.setdefault(session['monitor'], [0, 0])
+                    mon[0] += elapsed
+                    mon[1] += 1
+        return apps, monitors
+
+    def open_session(self) -> Optional[dict]:
+        """
+        The open session's app, monitor, idle flag and elapsed seconds, or None.
+
+        Only sessions that started today and have run for a second count, as in
+        the totals. summary(include_open=False) plus this equals summary().
+        """
+        with self._lock:
+            now = datetime.now()
+            self._roll_day(now)
+            session = self._open
+            if not session or session['_start'].strftime("%Y-%m-%d") != self._day:
+                return None
+            elapsed = int((now - session['_start']).total_seconds())
+            if elapsed <= 0:
+                return None
+            return {
+                'day': self._day,
+                'app_name': session['app_name'],
+                'monitor': session['monitor'],
+                'is_idle': bool(session['is_idle']),
+                'elapsed_seconds': elapsed,
+            }
+
+    def summary(self, include_idle: bool = False, include_open: bool = True) -> list[dict]:
+        """Per-app totals for today, shaped like db.get_today_summary."""
+        with self._lock:
+            apps, _ = self._snapshot(include_open)
+        return self._summary_rows(apps, include_idle)
+
+    @staticmethod
+    def _summary_rows(apps: dict, include_idle: bool = False) -> list[dict]:
+        totals: dict[str, list[int]] = {}
+        for (app_name, is_idle), (seconds, count) in apps.items():
+            if is_idle and not include_idle:
+                continue
+            total = totals.setdefault(app_name, [0, 0])
+            total[0] += seconds
+            total[1] += count
+        result = [
+            {'app_name': name, 'total_seconds': seconds, 'session_count': count}
+            for name, (seconds, count) in totals.items()
+        ]
+        result.sort(key=lambda x: x['total_seconds'], reverse=True)
+        return result
+
+    def monitor_breakdown(self, include_open: bool = True) -> list[dict]:
+        """Per-monitor totals for today, shaped like db.get_monitor_breakdown."""
+        with self._lock:
+            _, monitors = self._snapshot(include_open)
+        return self._monitor_rows(monitors)
+
+    @staticmethod
+    def _monitor_rows(monitors: dict) -> list[dict]:
+        return [
+            {'monitor': m, 'total_seconds': seconds, 'session_count': count}
+            for m, (seconds, count) in sorted(monitors.items())
+        ]
+
+    def idle_time(self) -> int:
+        """Total idle seconds today, shaped like db.get_today_idle_time."""
+        with self._lock:
+            apps, _ = self._snapshot()
+        return sum(seconds for (_app, is_idle), (seconds, _count) in apps.items() if is_idle)
+
+    def recent_sessions(self, limit: int = 20) -> list[dict]:
+        """Most recent sessions first, shaped like db.get_recent_sessions (open session included)."""
+        with self._lock:
+            sessions = list(self._recent)
+            if self._open:
+                current = {k: v for k, v in self._open.items() if k != '_start'}
+                current['duration_seconds'] = int((datetime.now() - self._open['_start']).total_seconds())
+                sessions.append(current)
+        return [dict(s) for s in reversed(sessions[-limit:])] if limit > 0 else []
+
+    def totals_for(self, app_names: list[str], monitors: list[int]) -> dict:
+        """Today's summary and monitor rows for just the given apps and monitors."""
+        # One lock hold, so the day and both sets of rows agree even across midnight
+        with self._lock:
+            app_counters, monitor_counters = self._snapshot()
+            day = self._day
+        apps = {r['app_name']: r for r in self._summary_rows(app_counters)}
+        breakdown = {r['monitor']: r for r in self._monitor_rows(monitor_counters)}
+        return {
+            'day': day,
+            'apps': [apps.get(name, {'app_name': name, 'total_seconds': 0, 'session_count': 0})
+                     for name in app_names],
+            'monitors': [breakdown.get(m, {'monitor': m, 'total_seconds': 0, 'session_count': 0})
+                         for m in monitors],
+        }
@@ -0,0 +1,177 @@
+"""Compiled keyword matching for media/reading detection and icon resolution."""
+
+import json
+import re
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Optional
+
+# Optional user overrides for the media/reading keyword lists
+KEYWORDS_PATH = Path(__file__).parent.parent / "keywords.json"
+
+
+class KeywordMatcher:
+    """
+    An ordered keyword table compiled into a single case-insensitive regex.
+
+    `search` answers "does any keyword occur in the text". `first` returns the
+    keyword that a linear scan of the table in order would have found first,
+    so tables where earlier entries take priority keep their meaning.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = list(dict.fromkeys(k.lower() for k in keywords if k))
+        self._priority = {k: i for i, k in enumerate(self.keywords)}
+        if self.keywords:
+            alternation = "|".join(re.escape(k) for k in self.keywords)
+            self._pattern = re.compile(alternation)
+            # Zero-width lookahead reports a match at every position, overlaps included
+            self._all_pattern = re.compile(f"(?=({alternation}))")
+        else:
+            self._pattern = self._all_pattern = None
+
+    def search(self, text: str) -> bool:
+        """True if any keyword is a substring of text (text must be lowercase)."""
+        return bool(self._pattern and self._pattern.search(text))
+
+    def first(self, text: str) -> Optional[str]:
+        """Highest-priority keyword contained in text (text must be lowercase)."""
+        if not self._all_pattern:
+            return None
+        best = None
+        for match in self._all_pattern.finditer(text):
+            keyword = match.group(1)
+            if best is None or self._priority[keyword] < self._priority[best]:
+                best = keyword
+                if self._priority[best] == 0:
+                    break
+        return best
+
+
+class MediaDetector:
+    """
+    Decides whether an (app, title) pair means the user is watching or reading.
+
+    Keyword lists come from the defaults passed in, optionally overridden by
+    keywords.json. The file is re-checked every `reload_interval` seconds and
+    recompiled when it changes, so edits apply without restarting the tracker.
+    """
+
+    CONFIG_KEYS = ('always_exempt_apps', 'video_streaming_keywords', 'reading_keywords')
+
+    def __init__(self, defaults: dict[str, list[str]], config_path: Path = KEYWORDS_PATH,
+                 reload_interval: float = 5.0, cache_size: int = 2048):
+        self.defaults = defaults
+        self.config_path = config_path
+        self.reload_interval = reload_interval
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        self._config_mtime: Optional[float] = None
+        self._last_check = 0.0
+        self._classify = None
+        self.reload()
+
+    def reload(self):
+        """
+        (Re)load keyword lists from defaults and the config file, then recompile.
+
+        A config file that cannot be read or holds anything but lists of
+        strings is logged and ignored: the previous matchers stay in place
+        (the defaults on first load) until the file changes again.
+        """
+        try:
+            mtime = self.config_path.stat().st_mtime
+        except OSError:
+            mtime = None
+        try:
+            classify = self._compile(self._load_lists())
+        except Exception as e:
+            print(f"[!] Could not load {self.config_path.name}, keeping the previous keyword lists: {e}")
+            if getattr(self, '_classify', None) is not None:
+                with self._lock:
+                    self._config_mtime = mtime
+                return
+            classify = self._compile({key: list(self.defaults.get(key, [])) for key in self.CONFIG_KEYS})
+
+        with self._lock:
+            self._classify = classify
+            self._config_mtime = mtime
+
+    def _load_lists(self) -> dict[str, list[str]]:
+        """Defaults with keywords.json overrides applied; raises if the file is malformed."""
+        lists = {key: list(self.defaults.get(key, [])) for key in self.CONFIG_KEYS}
+        try:
+            with open(self.config_path, 'r', encoding='utf-8') as f:
+                overrides = json.load(f)
+        except FileNotFoundError:
+            return lists
+        if not isinstance(overrides, dict):
+            raise ValueError("expected a JSON object")
+        for key in self.CONFIG_KEYS:
+            value = overrides.get(key)
+            if not isinstance(value, list):
+                continue
+            if not all(isinstance(k, str) for k in value):
+                raise ValueError(f"'{key}' must be a list of strings")
+            lists[key] = value
+        return lists
+
+    def _compile(self, lists: dict[str, list[str]]):
+        """Build the memoized classifier for a set of keyword lists."""
+        apps = KeywordMatcher(lists['always_exempt_apps'])
+        video = KeywordMatcher(lists['video_streaming_keywords'])
+        reading = KeywordMatcher(lists['reading_keywords'])
+
+        @lru_cache(maxsize=self.cache_size)
+        def classify(app_name: str, window_title: str) -> bool:
+            app_lower = app_name.lower()
+            title_lower = window_title.lower()
+            return (
+                apps.search(app_lower) or
+                video.search(title_lower) or
+                reading.search(app_lower) or
+                reading.search(title_lower)
+            )
+
+        return classify
+
+    def _maybe_reload(self):
+        """Reload if the config file changed since the last check (throttled)."""
+        now = time.monotonic()
+        if now - self._last_check < self.reload_interval:
+            return
+        self._last_check = now
+        try:
+            mtime = self.config_path.stat().st_mtime
+        except OSError:
+            mtime = None
+        if mtime != self._config_mtime:
+            self.reload()
+
+    def matches(self, app_name: str, window_title: str) -> bool:
+        """True if the app/title indicates media consumption or reading (memoized)."""
+        self._maybe_reload()
+        return self._classify(app_name, window_title)
+
+    def cache_info(self) -> dict:
+        """Memo statistics for diagnostics."""
+        info = self._classify.cache_info()
+        return {'hits': info.hits, 'misses': info.misses, 'size': info.currsize}
+
+
+class IconResolver:
+    """Maps an app name to an icon URL using ordered keyword tables (first table wins)."""
+
+    def __init__(self, tables: list[dict[str, str]], cache_size: int = 1024):
+        self._tables = [(KeywordMatcher(table.keys()), {k.lower(): v for k, v in table.items()}) for table in tables]
+        self.resolve = lru_cache(maxsize=cache_size)(self._resolve)
+
+    def _resolve(self, app_name: str) -> Optional[str]:
+        lower = app_name.lower()
+        for matcher, urls in self._tables:
+            keyword = matcher.first(lower)
+            if keyword is not None:
+                return urls[keyword]
+        return None
@@ -1,7 +1,7 @@
 """Core activity monitoring logic using Windows APIs."""
 
-import time
 import threading
+import time
 import ctypes
 from datetime import datetime
 from typing import Optional, Callable
@@ -11,11 +11,16 @@ import win32gui
 import win32process
 import win32api
 import win32con
-import psutil
 from screeninfo import get_monitors
 
 from . import db
 from .utils import sanitize_app_name
+from .writer import SessionWriter
+from .live import TodayModel
+from .procinfo import ProcessInfoCache
+from .matcher import MediaDetector
+from .scheduler import AdaptivePoller
+from .coalesce import SessionCoalescer
 
 
 # Windows API structure for idle detection
@@ -49,6 +54,7 @@ class ActivityState:
     session_id: Optional[int] = None
     start_time: Optional[datetime] = None
     is_idle: bool = False
+    session_label_id: Optional[int] = None
     
     def matches(self, other: 'ActivityState') -> bool:
         """Check if this state matches another (same app, title, monitor)."""
@@ -100,12 +106,26 @@ class ActivityMonitor:
         'microsoft edge webview', 'edge webview',
     ]
     
+    # Window switches shorter than this are coalesced instead of becoming sessions
+    COALESCE_DWELL_SECONDS = 2.0
+    # 'absorb' keeps flicker time in the surrounding session, 'bucket' records bursts as one row
+    COALESCE_MODE = 'absorb'
+    
+    # How often the open session is checkpointed so a crash loses little time
+    HEARTBEAT_INTERVAL = 30.0
+    
     def __init__(self, poll_interval: float = 1.0):
         self.poll_interval = poll_interval
+        self._poller = AdaptivePoller(base_interval=poll_interval)
         self.current_state: Optional[ActivityState] = None
         self.running = False
+        self._stop_event = threading.Event()
         self._thread: Optional[threading.Thread] = None
+        # Set (with its wall-clock time) once the first loop iteration has sampled the foreground window
+        self.first_sample = threading.Event()
+        self.first_sample_at: Optional[float] = None
         self._listeners: list[Callable] = []
+        self._event_listeners: list[Callable[[str, dict], None]] = []
         self._monitors_info = self._get_monitors_info()
         self._is_idle = False
         self._idle_start_time: Optional[datetime] = None
@@ -113,6 +133,16 @@ class ActivityMonitor:
         self._last_media_activity_time: Optional[datetime] = None  # Track when user was last in a media app
         self._media_grace_period = 180.0  # 3 minutes grace period after watching/reading
         self.current_session_label_id = None
+        self._last_heartbeat: Optional[datetime] = None
+        self._writer = SessionWriter()
+        self._coalescer = SessionCoalescer(self.COALESCE_DWELL_SECONDS, self.COALESCE_MODE)
+        self.today = TodayModel()  # Live in-memory view of today's totals
+        self._process_cache = ProcessInfoCache()
+        self._media_detector = MediaDetector({
+            'always_exempt_apps': self.ALWAYS_EXEMPT_APPS,
+            'video_streaming_keywords': self.VIDEO_STREAMING_KEYWORDS,
+            'reading_keywords': self.READING_KEYWORDS,
+        })
     
     def _get_monitors_info(self) -> list[dict]:
         """Get information about connected monitors."""
@@ -169,29 +199,9 @@ class ActivityMonitor:
         if not state:
             return False
         
-        app_name_lower = state.app_name.lower()
-        window_title_lower = state.window_title.lower()
-        
-        
-        # 1. Check standalone media apps (always exempt - if they opened it, they're using it)
-        for app in self.ALWAYS_EXEMPT_APPS:
-            if app in app_name_lower:
-                # print(f"[MEDIA DETECT] ✓ Matched always-exempt app: '{app}' in '{app_name_lower}'")
-                return True
-        
-        # 2. Check window title for video/streaming activity
-        for keyword in self.VIDEO_STREAMING_KEYWORDS:
-            if keyword in window_title_lower:
-                # print(f"[MEDIA DETECT] ✓ Matched video keyword: '{keyword}' in title")
-                return True  # Actively watching something
-        
-        # 3. Check for reading activity (PDFs, documents)
-        for keyword in self.READING_KEYWORDS:
-            if keyword in app_name_lower or keyword in window_title_lower:
-                # print(f"[MEDIA DETECT] ✓ Matched reading keyword: '{keyword}'")
-                return True
-        # Default: Allow idle detection (e.g., empty browser tab)
-        return False
+        # Always-exempt apps (app name), video keywords (title), reading keywords (either).
+        # Keyword lists are compiled once and can be overridden in keywords.json.
+        return self._media_detector.matches(state.app_name, state.window_title)
     
     def _get_active_window_info(self) -> Optional[ActivityState]:
         """Get information about the currently active window."""
@@ -207,11 +217,8 @@ class ActivityMonitor:
             
             # Get process name
             _, pid = win32process.GetWindowThreadProcessId(hwnd)
-            try:
-                process = psutil.Process(pid)
-                app_name = process.name()
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                app_name = "Unknown"
+            process_info = self._process_cache.lookup(pid)
+            app_name = process_info.name if process_info else "Unknown"
             
             # Get monitor
             monitor = self._get_window_monitor(hwnd)
@@ -242,10 +249,88 @@ class ActivityMonitor:
             except Exception as e:
                 print(f"Listener error: {e}")
     
+    def add_event_listener(self, callback: Callable[[str, dict], None]):
+        """
+        Add a listener for session and label events. Callback receives (event_type, data).
+
+        Events: 'session_started', 'session_ended' (the session row),
+        'totals_changed' (today's rows for the affected apps and monitors) and
+        'active_label_changed' ({'active_session_label_id': id}). Called on the
+        monitor thread.
+        """
+        self._event_listeners.append(callback)
+    
+    def remove_event_listener(self, callback: Callable):
+        """Remove an event listener."""
+        if callback in self._event_listeners:
+            self._event_listeners.remove(callback)
+    
+    def _emit(self, event: str, data: dict):
+        """Notify all event listeners."""
+        for listener in self._event_listeners:
+            try:
+                listener(event, data)
+            except Exception as e:
+                print(f"Event listener error: {e}")
+    
+    def _emit_session_events(self, closed: Optional[dict], started: Optional[dict]):
+        """Publish a session boundary plus the totals it changed."""
+        if not self._event_listeners:
+            return
+        if closed:
+            self._emit('session_ended', closed)
+        if started:
+            self._emit('session_started', started)
+        
+        sessions = [s for s in (closed, started) if s and not s['is_idle']]
+        app_names = list(dict.fromkeys(s['app_name'] for s in sessions))
+        monitors = list(dict.fromkeys(s['monitor'] for s in sessions if s['monitor'] > 0))
+        if app_names or monitors:
+            self._emit('totals_changed', self.today.totals_for(app_names, monitors))
+    
+    def _switch_to(self, new_state: ActivityState, at: datetime):
+        """Close the current session (if any) and open one for new_state in a single queued write."""
+        old_session_id = self.current_state.session_id if self.current_state else None
+        new_state.session_id = self._writer.allocate_session_id()
+        new_state.start_time = at
+        transition = (
+            old_session_id,
+            new_state.session_id,
+            new_state.app_name,
+            new_state.window_title,
+            new_state.monitor,
+            at,
+            new_state.is_idle,
+            new_state.session_label_id
+        )
+        self._writer.switch_session(*transition)
+        closed = self.today.session_switched(*transition)
+        self.current_state = new_state
+        if self._event_listeners:
+            self._emit_session_events(closed, self.today.recent_sessions(1)[0])
+    
+    def _end_current(self, at: datetime):
+        """Close the current session without opening a new one."""
+        if self.current_state and self.current_state.session_id:
+            self._writer.end_session(self.current_state.session_id, at)
+            closed = self.today.session_ended(self.current_state.session_id, at)
+            self._emit_session_events(closed, None)
+    
+    def _maybe_heartbeat(self):
+        """Checkpoint the open session every HEARTBEAT_INTERVAL seconds."""
+        if not self.current_state or not self.current_state.session_id:
+            return
+        now = datetime.now()
+        if self._last_heartbeat and (now - self._last_heartbeat).total_seconds() < self.HEARTBEAT_INTERVAL:
+            return
+        self._last_heartbeat = now
+        self._writer.heartbeat(self.current_state.session_id, now)
+    
     def _monitoring_loop(self):
         """Main monitoring loop with smart idle detection."""
         while self.running:
             idle_seconds = get_idle_duration()
+            previous_session_id = self.current_state.session_id if self.current_state else None
             
             # Get current active window to check if it's a media/reading app
             current_window = self._get_active_window_info()
@@ -284,26 +369,16 @@ class ActivityMonitor:
                     # Save current state before going idle
                     if self.current_state and not self.current_state.is_idle:
                         self._pre_idle_state = self.current_state
-                        # End current active session
-                        if self.current_state.session_id:
-                            db.end_session(self.current_state.session_id)
                     
-                    # Start idle session
+                    # End current active session and start the idle one in a single write
+                    self._coalescer.reset()
                     idle_state = ActivityState(
                         app_name="Idle",
                         window_title="User is idle",
                         monitor=0,
                         is_idle=True
                     )
-                    session_id = db.start_session(
-                        idle_state.app_name,
-                        idle_state.window_title,
-                        idle_state.monitor,
-                        is_idle=True
-                    )
-                    idle_state.session_id = session_id
-                    idle_state.start_time = self._idle_start_time
-                    self.current_state = idle_state
+                    self._switch_to(idle_state, self._idle_start_time)
                 
                 # Notify listeners about idle state
                 elapsed = 0
@@ -313,38 +388,34 @@ class ActivityMonitor:
             
             else:
                 # User is active (either moving mouse/keyboard OR watching/reading)
+                # Normal activity tracking
+                new_state = current_window  # Use the window we already fetched
+                
                 if self._is_idle:
-                    # Just came back from idle - end idle session
+                    # Just came back from idle - the idle session is closed by the next switch
                     self._is_idle = False
-                    if self.current_state and self.current_state.session_id:
-                        db.end_session(self.current_state.session_id)
-                    self.current_state = None
                     self._idle_start_time = None
-                
-                # Normal activity tracking
-                new_state = current_window  # Use the window we already fetched
+                    if not new_state and self.current_state:
+                        self._end_current(datetime.now())
+                        self.current_state = None
                 
                 if new_state:
-                    if (self.current_state is None or 
-                        not self.current_state.matches(new_state) or 
-                        self.current_state.session_label_id != self.current_session_label_id):
-                        
-                        # Activity changed - end old session, start new one
-                        if self.current_state and self.current_state.session_id:
-                            db.end_session(self.current_state.session_id)
-                        
-                        # Start new session
-                        session_id = db.start_session(
-                            new_state.app_name,
-                            new_state.window_title,
-                            new_state.monitor,
-                            is_idle=False,
-                            session_label_id=self.current_session_label_id
-                        )
-                        new_state.session_id = session_id
-                        new_state.session_label_id = self.current_session_label_id
-                        new_state.start_time = datetime.now()
-                        self.current_state = new_state
+                    # Activity changes go through the coalescer; only windows that hold
+                    # focus for the dwell threshold become sessions (label changes apply at once)
+                    new_state.session_label_id = self.current_session_label_id
+                    label_changed = (self.current_state is not None and
+                                     self.current_state.session_label_id != self.current_session_label_id)
+                    promotion = self._coalescer.observe(self.current_state, new_state, datetime.now(), force=label_changed)
+                    if promotion:
+                        if promotion.bucket_start:
+                            bucket_state = ActivityState(
+                                app_name="Switching",
+                                window_title="Short switches",
+                                monitor=promotion.state.monitor,
+                                session_label_id=self.current_session_label_id
+                            )
+                            self._switch_to(bucket_state, promotion.bucket_start)
+                        self._switch_to(promotion.state, promotion.start_time)
                     
                     # Calculate elapsed time for current session
                     elapsed = 0
@@ -354,17 +425,32 @@ class ActivityMonitor:
                     # Notify listeners
                     self._notify_listeners(self.current_state, elapsed)
             
-            time.sleep(self.poll_interval)
+            self._maybe_heartbeat()
+            
+            # Sleep adaptively: tight while switching, relaxed when stable, idle or on battery
+            current_session_id = self.current_state.session_id if self.current_state else None
+            interval = self._poller.next_interval(
+                changed=current_session_id != previous_session_id or self._coalescer.pending is not None,
+                idle_seconds=idle_seconds,
+                idle_threshold=self.IDLE_THRESHOLD
+            )
+            if not self.first_sample.is_set():
+                self.first_sample_at = time.time()
+                self.first_sample.set()
+            self._stop_event.wait(interval)
     
     def start(self):
         """Start monitoring."""
         if self.running:
             return
         
-        # Initialize database
-        db.init_db()
+        # Initialize database; the tracker owns any open rows, so it recovers those left by a crash
+        db.init_db(recover=True)
+        self._writer.start()
+        self.today.load()
         
         self.running = True
+        self._stop_event.clear()
         self._thread = threading.Thread(target=self._monitoring_loop, daemon=True)
         self._thread.start()
         print("[+] Activity monitoring started...")
@@ -372,14 +458,16 @@ class ActivityMonitor:
     def stop(self):
         """Stop monitoring."""
         self.running = False
-        
-        # End current session
-        if self.current_state and self.current_state.session_id:
-            db.end_session(self.current_state.session_id)
+        self._stop_event.set()
         
         if self._thread:
             self._thread.join(timeout=2.0)
         
+        # End current session and flush pending writes
+        self._end_current(datetime.now())
+        self._writer.stop()
+        print(f"[*] Coalesced {self._coalescer.rows_saved} short window switches (rows saved).")
+        
         print("[*] Activity monitoring stopped.")
     
     def get_current_activity(self) -> Optional[dict]:
@@ -407,10 +495,27 @@ class ActivityMonitor:
         
         return result
     
+    def get_diagnostics(self) -> dict:
+        """Internal performance counters for the tracker."""
+        return {
+            'process_cache': self._process_cache.stats(),
+            'media_detector_cache': self._media_detector.cache_info(),
+            'scheduler': self._poller.stats(),
+            'coalescer': self._coalescer.stats(),
+            'first_sample_at': self.first_sample_at,
+            'writer': {
+                'batches_written': self._writer.batches_written,
+                'ops_written': self._writer.ops_written,
+                'ops_dropped': self._writer.ops_dropped,
+                'heartbeats_dropped': self._writer.heartbeats_dropped,
+            },
+        }
+    
     def set_active_session_label(self, session_label_id: Optional[int]):
         """Sets the session label ID to be associated with all new activity logs."""
         self.current_session_label_id = session_label_id
         print(f"[*] Monitor context switched: Session Label ID {session_label_id}")
+        self._emit('active_label_changed', {'active_session_label_id': session_label_id})
     
     def _format_duration(self, seconds: int) -> str:
         """Format duration for display."""
@@ -0,0 +1,128 @@
+"""Cache of resolved process metadata for foreground window lookups."""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+import psutil
+
+
+@dataclass(frozen=True)
+class ProcessInfo:
+    """Resolved metadata for a running process."""
+    pid: int
+    name: str
+    exe: Optional[str]
+    create_time: float
+
+
+class ProcessInfoCache:
+    """
+    Bounded LRU cache of process metadata keyed by (pid, create_time).
+
+    A cached pid is trusted for `revalidate_interval` seconds; after that a
+    single create_time() call confirms it is still the same process, so pid
+    reuse is detected without re-reading name and exe. Dead processes are
+    evicted when a lookup fails and by a periodic sweep.
+    """
+
+    def __init__(self, max_size: int = 256, revalidate_interval: float = 5.0, sweep_interval: float = 60.0):
+        self.max_size = max_size
+        self.revalidate_interval = revalidate_interval
+        self.sweep_interval = sweep_interval
+        self._entries: OrderedDict[tuple[int, float], ProcessInfo] = OrderedDict()
+        self._by_pid: dict[int, tuple[int, float]] = {}
+        self._validated_at: dict[tuple[int, float], float] = {}
+        self._last_sweep = time.monotonic()
+        # Counters for stats()
+        self.hits = 0
+        self.misses = 0
+        self.pid_reuse = 0
+        self.evictions = 0
+        self._hit_ns = 0
+        self._miss_ns = 0
+
+    def lookup(self, pid: int) -> Optional[ProcessInfo]:
+        """Resolve a pid to its ProcessInfo, or None if it is gone or inaccessible."""
+        started = time.perf_counter_ns()
+        now = time.monotonic()
+        if now - self._last_sweep >= self.sweep_interval:
+            self._sweep(now)
+
+        key = self._by_pid.get(pid)
+        process = None
+        if key is not None:
+            if now - self._validated_at[key] < self.revalidate_interval:
+                return self._hit(key, started)
+            try:
+                process = psutil.Process(pid)
+                if process.create_time() == key[1]:
+                    self._validated_at[key] = now
+                    return self._hit(key, started)
+                self.pid_reuse += 1
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                process = None
+            self._evict(key)
+
+        info = self._resolve(pid, process)
+        if info is not None:
+            key = (pid, info.create_time)
+            self._entries[key] = info
+            self._by_pid[pid] = key
+            self._validated_at[key] = now
+            while len(self._entries) > self.max_size:
+                self._evict(next(iter(self._entries)))
+        self.misses += 1
+        self._miss_ns += time.perf_counter_ns() - started
+        return info
+
+    def _hit(self, key: tuple[int, float], started: int) -> ProcessInfo:
+        self._entries.move_to_end(key)
+        self.hits += 1
+        self._hit_ns += time.perf_counter_ns() - started
+        return self._entries[key]
+
+    def _resolve(self, pid: int, process: Optional[psutil.Process] = None) -> Optional[ProcessInfo]:
+        """Read name, exe and create_time for a pid (the slow path)."""
+        try:
+            process = process or psutil.Process(pid)
+            with process.oneshot():
+                name = process.name()
+                create_time = process.create_time()
+                try:
+                    exe = process.exe()
+                except (psutil.AccessDenied, psutil.ZombieProcess, OSError):
+                    exe = None
+            return ProcessInfo(pid=pid, name=name, exe=exe, create_time=create_time)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return None
+
+    def _evict(self, key: tuple[int, float]):
+        self._entries.pop(key, None)
+        self._validated_at.pop(key, None)
+        if self._by_pid.get(key[0]) == key:
+            del self._by_pid[key[0]]
+        self.evictions += 1
+
+    def _sweep(self, now: float):
+        """Drop entries whose process has exited."""
+        self._last_sweep = now
+        for key in list(self._entries):
+            if not psutil.pid_exists(key[0]):
+                self._evict(key)
+
+    def stats(self) -> dict:
+        """Hit rate and lookup latency figures."""
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'lookups': lookups,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'pid_reuse_detected': self.pid_reuse,
+            'evictions': self.evictions,
+            'avg_hit_us': round(self._hit_ns / self.hits / 1000, 2) if self.hits else 0.0,
+            'avg_miss_us': round(self._miss_ns / self.misses / 1000, 2) if self.misses else 0.0,
+        }
@@ -0,0 +1,143 @@
+"""Content-addressed cache of rendered reports and per-day aggregates for closed days."""
+
+import hashlib
+import json
+import re
+from datetime import date
+from pathlib import Path
+from typing import Callable, Optional
+
+from . import db
+from .aggregate import SessionAggregator
+from .utils import date_range_ms
+
+# Cached report names end in a 16-hex-digit digest: <prefix>_<range>_<digest>.<ext>
+_DIGEST_RE = re.compile(r'^[0-9a-f]{16}$')
+
+
+def day_fingerprints(start_date: Optional[str], end_date: Optional[str]) -> dict[str, str]:
+    """
+    Fingerprint of each day's sessions in an inclusive date range (None = unbounded).
+
+    Any insert, close, merge or relabel of a session changes its day's
+    fingerprint, so a cached result keyed by it can never be stale. Per-row
+    values are summed weighted by session id, so swapping labels (or idle
+    flags, or durations) between sessions changes the sum even when the plain
+    totals stay the same. Days without sessions are left out. One grouped
+    query covers the whole range.
+    """
+    start_ms, end_ms = date_range_ms(start_date, end_date)
+    clauses, params = [], []
+    if start_ms is not None:
+        clauses.append("start_ms >= ?")
+        params.append(start_ms)
+    if end_ms is not None:
+        clauses.append("start_ms < ?")
+        params.append(end_ms)
+    where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+    with db.get_read_db() as conn:
+        rows = conn.execute(f"""
+            SELECT substr(start_time, 1, 10) AS day, COUNT(*), MAX(id), SUM(duration_seconds),
+                   MAX(end_ms), SUM(id * duration_seconds), SUM(id * is_idle),
+                   SUM(id * COALESCE(session_label_id, 0))
+            FROM sessions{where}
+            GROUP BY day
+        """, params).fetchall()
+    return {row[0]: hashlib.sha1(repr(tuple(row[1:])).encode()).hexdigest() for row in rows}
+
+
+def labels_fingerprint() -> str:
+    """Fingerprint of the session label names (JSON reports include them)."""
+    with db.get_read_db() as conn:
+        rows = conn.execute("SELECT id, name FROM session_labels ORDER BY id").fetchall()
+    return hashlib.sha1(repr([tuple(row) for row in rows]).encode()).hexdigest()
+
+
+def is_closed(day: str) -> bool:
+    """Whether a YYYY-MM-DD day is over, so its sessions can no longer grow."""
+    return day < date.today().isoformat()
+
+
+class ReportCache:
+    """
+    Exports and aggregates for closed days, addressed by what they were built from.
+
+    A rendered report lives directly in `root` (the exports folder) as
+    `<prefix>_<range>_<digest>.<ext>`, where the digest covers the format,
+    the date range, every day's fingerprint, the label fingerprint and the
+    exporter's template version. Per-day SessionAggregator state lives under
+    `root/.cache/` keyed by the day's fingerprint, so multi-day reports can
+    be assembled with merge() instead of re-reading every session. Writing
+    a new entry removes older entries for the same range or day.
+    """
+
+    def __init__(self, root: Path, template_version: int):
+        self.root = root
+        self.template_version = template_version
+
+    @property
+    def aggregates_dir(self) -> Path:
+        return self.root / ".cache"
+
+    def report_path(
+        self,
+        format_type: str,
+        prefix: str,
+        extension: str,
+        start_date: Optional[str],
+        end_date: Optional[str],
+        extra: str = ""
+    ) -> Optional[Path]:
+        """
+        Where the report for a closed range is (or will be) stored, or None if
+        the range is open-ended or includes today. `extra` folds additional
+        inputs (e.g. the daily notes for HTML) into the digest.
+        """
+        if start_date and not end_date:
+            end_date = start_date
+        if not start_date or not is_closed(end_date[:10]):
+            return None
+        start_date, end_date = start_date[:10], end_date[:10]
+        key = json.dumps([
+            format_type,
+            start_date,
+            end_date,
+            sorted(day_fingerprints(start_date, end_date).items()),
+            labels_fingerprint(),
+            self.template_version,
+            extra,
+        ])
+        digest = hashlib.sha256(key.encode()).hexdigest()[:16]
+        label = start_date if start_date == end_date else f"{start_date}_{end_date}"
+        return self.root / f"{prefix}_{label}_{digest}.{extension}"
+
+    def store(self, path: Path, rendered: Path) -> Path:
+        """Move a freshly rendered report into its cache slot."""
+        self.root.mkdir(exist_ok=True)
+        base = path.stem.rsplit('_', 1)[0]  # <prefix>_<range>
+        for stale in self.root.glob(f"{base}_*{path.suffix}"):
+            # Timestamped exports share the prefix but never end in a digest
+            stale_base, _, digest = stale.stem.rpartition('_')
+            if stale != path and stale_base == base and _DIGEST_RE.match(digest):
+                stale.unlink(missing_ok=True)
+        rendered.replace(path)
+        return path
+
+    def aggregate(self, day: str, fingerprint: str, compute: Callable[[], SessionAggregator]) -> SessionAggregator:
+        """A closed day's aggregator from disk, computing and storing it on a miss."""
+        path = self.aggregates_dir / f"{day}_{fingerprint[:16]}.json"
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return SessionAggregator.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError):
+            pass
+
+        aggregator = compute()
+        self.aggregates_dir.mkdir(parents=True, exist_ok=True)
+        for stale in self.aggregates_dir.glob(f"{day}_*.json"):
+            stale.unlink(missing_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(aggregator.to_dict(), f)
+        tmp.replace(path)
+        return aggregator
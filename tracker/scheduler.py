@@ -0,0 +1,102 @@
+"""Adaptive polling interval for the monitoring loop."""
+
+import time
+from typing import Optional
+
+import psutil
+
+
+class AdaptivePoller:
+    """
+    Chooses how long the monitoring loop sleeps before the next sample.
+
+    - Window switches drop the interval to `min_interval` and keep it there
+      while switching stays rapid (within `burst_window` seconds).
+    - A stable window, or no keyboard/mouse input, grows the interval by
+      `backoff` per tick.
+    - Running on battery multiplies the interval by `battery_factor`.
+    - The interval never exceeds `max_error`. A switch is noticed at most one
+      interval late, so this bounds the error in any recorded duration. The
+      poller also never sleeps past the moment the idle threshold is reached.
+    """
+
+    def __init__(
+        self,
+        min_interval: float = 0.5,
+        base_interval: float = 1.0,
+        max_interval: float = 5.0,
+        max_error: float = 5.0,
+        backoff: float = 1.5,
+        burst_window: float = 10.0,
+        input_idle_after: float = 30.0,
+        battery_factor: float = 2.0,
+        battery_check_interval: float = 60.0
+    ):
+        self.min_interval = min_interval
+        self.base_interval = base_interval
+        self.max_interval = max_interval
+        self.max_error = max_error
+        self.backoff = backoff
+        self.burst_window = burst_window
+        self.input_idle_after = input_idle_after
+        self.battery_factor = battery_factor
+        self.battery_check_interval = battery_check_interval
+        self.interval = base_interval
+        self._last_change: Optional[float] = None
+        self._on_battery = False
+        self._battery_checked_at: Optional[float] = None
+        # Counters for stats()
+        self.wakeups = 0
+        self._slept_total = 0.0
+
+    @property
+    def on_battery(self) -> bool:
+        """Whether the machine is running on battery (refreshed every battery_check_interval)."""
+        now = time.monotonic()
+        if self._battery_checked_at is None or now - self._battery_checked_at >= self.battery_check_interval:
+            self._battery_checked_at = now
+            try:
+                battery = psutil.sensors_battery()
+                self._on_battery = bool(battery and not battery.power_plugged)
+            except Exception:
+                self._on_battery = False
+        return self._on_battery
+
+    def next_interval(self, changed: bool, idle_seconds: float, idle_threshold: float) -> float:
+        """Return the sleep before the next sample, given what happened on this tick."""
+        now = time.monotonic()
+        if changed:
+            self._last_change = now
+
+        if changed or (self._last_change is not None and now - self._last_change < self.burst_window):
+            # Rapid switching: sample tightly so short visits are attributed correctly
+            interval = self.min_interval
+        elif idle_seconds >= self.input_idle_after:
+            # No input: nothing is likely to change soon
+            interval = self.max_interval
+        else:
+            # Same window staying in focus: back off gradually
+            interval = min(max(self.interval, self.base_interval) * self.backoff, self.max_interval)
+
+        self.interval = interval
+        if self.on_battery:
+            interval *= self.battery_factor
+
+        # Wake up in time to notice the idle threshold being crossed
+        if idle_seconds < idle_threshold:
+            interval = min(interval, max(idle_threshold - idle_seconds, self.min_interval))
+
+        interval = max(self.min_interval, min(interval, self.max_error))
+        self.wakeups += 1
+        self._slept_total += interval
+        return interval
+
+    def stats(self) -> dict:
+        """Scheduler figures for diagnostics."""
+        return {
+            'current_interval': round(self.interval, 3),
+            'wakeups': self.wakeups,
+            'avg_interval': round(self._slept_total / self.wakeups, 3) if self.wakeups else 0.0,
+            'on_battery': self._on_battery,
+            'max_error_seconds': self.max_error,
+        }
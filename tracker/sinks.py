@@ -0,0 +1,142 @@
+"""Report delivery sinks: where finished exports are pushed (Google Drive, a local folder, ...)."""
+
+import shutil
+import statistics
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Optional
+
+# Files pushed at the same time by push_batch() unless told otherwise
+PUSH_WORKERS = 4
+
+
+class ReportSink(ABC):
+    """
+    Destination for report files.
+
+    push(path, folder) delivers one file and returns where it ended up (a
+    Drive file ID, a path, ...), raising on failure. It has the uploader
+    signature tracker.uploads expects, so any sink can drain the upload
+    queue. Implementations must be safe to call from several threads.
+    """
+
+    name = "sink"
+
+    @abstractmethod
+    def push(self, path: str, folder: str = 'WS') -> str:
+        """Deliver one file into `folder`; returns its remote location."""
+
+
+class DriveSink(ReportSink):
+    """Google Drive, through upload.py's shared DriveClient."""
+
+    name = "drive"
+
+    def push(self, path: str, folder: str = 'WS') -> str:
+        # Imported on first use so offline sinks never load the Google client stack
+        from upload import upload_file
+        return upload_file(str(path), folder)
+
+
+class LocalDirectorySink(ReportSink):
+    """
+    Copies files into `root/<folder>/`, for tests and offline benchmarks.
+
+    `latency` adds a fixed delay per push to stand in for a network round
+    trip, so concurrency effects show up without a network.
+    """
+
+    name = "local"
+
+    def __init__(self, root: Path, latency: float = 0.0):
+        self.root = Path(root)
+        self.latency = latency
+
+    def push(self, path: str, folder: str = 'WS') -> str:
+        if self.latency:
+            time.sleep(self.latency)
+        target_dir = self.root / folder
+        target_dir.mkdir(parents=True, exist_ok=True)
+        target = target_dir / Path(path).name
+        tmp = target.with_name(target.name + ".part")
+        shutil.copyfile(path, tmp)
+        tmp.replace(target)
+        return str(target)
+
+
+@dataclass
+class PushResult:
+    """Outcome of delivering one file."""
+    path: str
+    seconds: float
+    size: int
+    remote: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class BatchPush:
+    """Results of push_batch() with throughput and latency figures."""
+    sink: str
+    workers: int
+    elapsed_seconds: float = 0.0
+    results: list[PushResult] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        latencies = sorted(r.seconds for r in self.results) or [0.0]
+        delivered = [r for r in self.results if r.ok]
+        elapsed = self.elapsed_seconds or 1e-9
+        return {
+            'sink': self.sink,
+            'workers': self.workers,
+            'files': len(self.results),
+            'failed': len(self.results) - len(delivered),
+            'elapsed_seconds': round(self.elapsed_seconds, 3),
+            'files_per_second': round(len(delivered) / elapsed, 2),
+            'mb_per_second': round(sum(r.size for r in delivered) / elapsed / 1e6, 2),
+            'latency_ms': {
+                'p50': round(statistics.median(latencies) * 1000, 1),
+                'p95': round(latencies[int(0.95 * (len(latencies) - 1))] * 1000, 1),
+                'max': round(latencies[-1] * 1000, 1),
+            },
+        }
+
+
+def _push_one(sink: ReportSink, path: str, folder: str) -> PushResult:
+    start = time.perf_counter()
+    size = Path(path).stat().st_size if Path(path).exists() else 0
+    try:
+        remote = sink.push(path, folder)
+        return PushResult(path=path, seconds=time.perf_counter() - start, size=size, remote=remote)
+    except Exception as e:
+        return PushResult(path=path, seconds=time.perf_counter() - start, size=size, error=str(e))
+
+
+def push_batch(
+    sink: ReportSink,
+    paths: Iterable,
+    folder: str = 'WS',
+    workers: int = PUSH_WORKERS
+) -> BatchPush:
+    """
+    Push many files to a sink concurrently on `workers` threads.
+
+    A failed file does not stop the others; its PushResult carries the
+    error. Results keep the order of `paths`.
+    """
+    # Imported here so the tracker's startup path (DriveSink only) skips concurrent.futures
+    from concurrent.futures import ThreadPoolExecutor
+
+    paths = [str(p) for p in paths]
+    batch = BatchPush(sink=sink.name, workers=workers)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="workshot-push") as pool:
+        batch.results = list(pool.map(lambda path: _push_one(sink, path, folder), paths))
+    batch.elapsed_seconds = time.perf_counter() - start
+    return batch
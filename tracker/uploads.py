@@ -0,0 +1,214 @@
+"""Durable upload queue, drained by a background worker with retries and backoff."""
+
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+from . import db
+
+# Row states in the upload_queue table
+PENDING = 'pending'
+UPLOADING = 'uploading'
+DONE = 'done'
+FAILED = 'failed'
+
+# Uploads allowed to run at the same time
+UPLOAD_WORKERS = 2
+# Attempts before an upload is marked failed for good
+MAX_ATTEMPTS = 8
+# Retry delay doubles per failed attempt, from BACKOFF_BASE up to BACKOFF_MAX seconds
+BACKOFF_BASE = 5.0
+BACKOFF_MAX = 1800.0
+# How often the worker re-checks the queue when nothing woke it
+POLL_INTERVAL = 30.0
+
+# Called as uploader(path, folder), e.g. ReportSink.push from tracker.sinks; raises on failure
+Uploader = Callable[[str, str], None]
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def backoff_seconds(attempts: int) -> float:
+    """Delay before retry number `attempts` (1-based), with +/-20% jitter."""
+    delay = min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX)
+    return delay * random.uniform(0.8, 1.2)
+
+
+class UploadQueue:
+    """
+    Files to upload, persisted in the upload_queue table.
+
+    enqueue() only inserts a row and wakes the worker, so it returns right
+    away even when the network is slow or down. The worker thread claims due
+    rows, runs up to `workers` uploads at once on daemon threads and
+    reschedules failures with exponential backoff until MAX_ATTEMPTS. Rows
+    still marked uploading when the process exits are picked up again by
+    start() on the next run.
+    """
+
+    def __init__(self, workers: int = UPLOAD_WORKERS, max_attempts: int = MAX_ATTEMPTS):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self._uploader: Optional[Uploader] = None
+        self._thread: Optional[threading.Thread] = None
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._idle = threading.Condition(self._lock)
+        # Counters for stats()
+        self.uploaded = 0
+        self.retries = 0
+        self.failed = 0
+
+    def enqueue(self, path: str, folder: str = 'WS') -> int:
+        """Queue a file for upload (or return the id already queued for it)."""
+        path = str(Path(path).resolve())
+        now = _now_ms()
+        with db.get_db() as conn:
+            row = conn.execute(
+                "SELECT id FROM upload_queue WHERE path = ? AND folder = ? AND status IN (?, ?)",
+                (path, folder, PENDING, UPLOADING)
+            ).fetchone()
+            if row:
+                return row[0]
+            cursor = conn.execute("""
+                INSERT INTO upload_queue (path, folder, status, next_attempt_ms, created_ms, updated_ms)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (path, folder, PENDING, now, now, now))
+            upload_id = cursor.lastrowid
+        self._wake.set()
+        return upload_id
+
+    def start(self, uploader: Uploader):
+        """Resume interrupted uploads and start the worker (call after db.init_db)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._uploader = uploader
+        with db.get_db() as conn:
+            conn.execute(
+                "UPDATE upload_queue SET status = ?, updated_ms = ? WHERE status = ?",
+                (PENDING, _now_ms(), UPLOADING)
+            )
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="workshot-uploads", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> bool:
+        """
+        Stop claiming uploads and wait up to `timeout` seconds for those in
+        flight. Returns False if some were still running; they stay queued
+        and are retried on the next start.
+        """
+        if not self._thread:
+            return True
+        deadline = time.monotonic() + timeout
+        self._stopping.set()
+        self._wake.set()
+        self._thread.join(timeout=timeout)
+        self._thread = None
+        with self._idle:
+            while self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+    def _run(self):
+        """Worker loop: claim due rows while upload slots are free, then sleep until the next is due."""
+        while not self._stopping.is_set():
+            self._wake.clear()
+            with self._lock:
+                free = self.workers - self._in_flight
+            for row in self._claim_due(free) if free > 0 else []:
+                with self._lock:
+                    self._in_flight += 1
+                threading.Thread(target=self._upload, args=(row,), name="workshot-upload", daemon=True).start()
+            self._wake.wait(self._seconds_until_next_due())
+
+    def _claim_due(self, limit: int) -> list[dict]:
+        """Mark up to `limit` due pending rows as uploading and return them."""
+        now = _now_ms()
+        with db.get_db() as conn:
+            rows = conn.execute("""
+                SELECT id, path, folder, attempts FROM upload_queue
+                WHERE status = ? AND next_attempt_ms <= ?
+                ORDER BY next_attempt_ms, id LIMIT ?
+            """, (PENDING, now, limit)).fetchall()
+            conn.executemany(
+                "UPDATE upload_queue SET status = ?, updated_ms = ? WHERE id = ?",
+                [(UPLOADING, now, row['id']) for row in rows]
+            )
+        return [dict(row) for row in rows]
+
+    def _seconds_until_next_due(self) -> float:
+        with db.get_read_db() as conn:
+            next_ms = conn.execute(
+                "SELECT MIN(next_attempt_ms) FROM upload_queue WHERE status = ?", (PENDING,)
+            ).fetchone()[0]
+        if next_ms is None:
+            return POLL_INTERVAL
+        return min(max((next_ms - _now_ms()) / 1000, 0.05), POLL_INTERVAL)
+
+    def _upload(self, row: dict):
+        """Run one upload (on its own daemon thread) and record the outcome."""
+        attempts = row['attempts'] + 1
+        try:
+            if not Path(row['path']).exists():
+                self._finish(row['id'], FAILED, attempts, "File no longer exists")
+                return
+            self._uploader(row['path'], row['folder'])
+        except Exception as e:
+            if attempts >= self.max_attempts:
+                print(f"[!] Upload of {row['path']} failed after {attempts} attempts: {e}")
+                self._finish(row['id'], FAILED, attempts, str(e))
+            else:
+                delay = backoff_seconds(attempts)
+                print(f"[!] Upload of {row['path']} failed ({e}), retrying in {delay:.0f}s")
+                self._finish(row['id'], PENDING, attempts, str(e), next_attempt_ms=_now_ms() + int(delay * 1000))
+        else:
+            self._finish(row['id'], DONE, attempts)
+        finally:
+            with self._idle:
+                self._in_flight -= 1
+                self._idle.notify_all()
+            self._wake.set()
+
+    def _finish(self, upload_id: int, status: str, attempts: int, error: Optional[str] = None, next_attempt_ms: int = 0):
+        if status == DONE:
+            self.uploaded += 1
+        elif status == FAILED:
+            self.failed += 1
+        else:
+            self.retries += 1
+        with db.get_db() as conn:
+            conn.execute("""
+                UPDATE upload_queue
+                SET status = ?, attempts = ?, last_error = ?, next_attempt_ms = ?, updated_ms = ?
+                WHERE id = ?
+            """, (status, attempts, error, next_attempt_ms, _now_ms(), upload_id))
+
+    def stats(self) -> dict:
+        return {
+            'running': bool(self._thread and self._thread.is_alive()),
+            'in_flight': self._in_flight,
+            'uploaded': self.uploaded,
+            'retries': self.retries,
+            'failed': self.failed,
+        }
+
+
+_upload_queue: Optional[UploadQueue] = None
+
+
+def get_upload_queue() -> UploadQueue:
+    """Get or create the global upload queue."""
+    global _upload_queue
+    if _upload_queue is None:
+        _upload_queue = UploadQueue()
+    return _upload_queue
@@ -1,6 +1,7 @@
 """Utility functions for time formatting and data processing."""
 
 from datetime import datetime, timedelta
+from typing import Optional
 
 
 def format_duration(seconds: int) -> str:
@@ -43,6 +44,30 @@ def get_today_range() -> tuple[datetime, datetime]:
     return today, tomorrow
 
 
+def to_epoch_ms(dt: datetime) -> int:
+    """Convert a naive local datetime to integer epoch milliseconds."""
+    return int(round(dt.timestamp() * 1000))
+
+
+def from_epoch_ms(ms: int) -> datetime:
+    """Convert epoch milliseconds back to a naive local datetime."""
+    return datetime.fromtimestamp(ms / 1000)
+
+
+def date_range_ms(start_date: Optional[str], end_date: Optional[str]) -> tuple[Optional[int], Optional[int]]:
+    """
+    Convert inclusive YYYY-MM-DD bounds to a half-open [start, end) epoch-ms range.
+    
+    Missing bounds are returned as None (unbounded).
+    """
+    start_ms = end_ms = None
+    if start_date:
+        start_ms = to_epoch_ms(datetime.strptime(start_date[:10], "%Y-%m-%d"))
+    if end_date:
+        end_ms = to_epoch_ms(datetime.strptime(end_date[:10], "%Y-%m-%d") + timedelta(days=1))
+    return start_ms, end_ms
+
+
 def truncate_text(text: str, max_length: int = 50) -> str:
     """Truncate text with ellipsis if too long."""
     if len(text) <= max_length:
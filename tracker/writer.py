@@ -0,0 +1,208 @@
+"""Single-writer persistence thread for session transitions."""
+
+import itertools
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Optional
+
+import sqlite3
+
+from . import db
+
+
+# A queued write: a callable that receives an open cursor inside the batch transaction
+WriteOp = Callable[[sqlite3.Cursor], None]
+
+# Sentinel used to wake the writer thread on shutdown
+_STOP = object()
+
+# Lock-error retries back off from retry_delay, doubling up to this many seconds
+MAX_RETRY_DELAY = 5.0
+
+
+class _Heartbeat:
+    """Checkpoint op; only the latest heartbeat per session in a batch is written."""
+
+    def __init__(self, session_id: int, at: datetime):
+        self.session_id = session_id
+        self.at = at
+
+    def __call__(self, cursor: sqlite3.Cursor):
+        db.heartbeat_session(cursor, self.session_id, self.at)
+
+
+class SessionWriter:
+    """
+    Owns all session writes on a dedicated thread.
+
+    The polling thread only enqueues operations; the writer drains whatever is
+    pending and applies it in one transaction, so a slow disk or a locked
+    database never delays the sampling tick. Session IDs are allocated up front
+    on the caller's side so the monitor never has to wait for an INSERT.
+
+    Enqueueing never blocks: when the queue is full, pending heartbeats are
+    dropped first (a later heartbeat or the close supersedes them) and
+    session transitions are queued past the limit rather than lost.
+    """
+
+    def __init__(
+        self,
+        max_queue: int = 1024,
+        max_batch: int = 256,
+        retry_delay: float = 0.5,
+        max_attempts: int = 8
+    ):
+        self.max_batch = max_batch
+        self.retry_delay = retry_delay
+        self.max_attempts = max_attempts
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._id_counter: Optional[itertools.count] = None
+        self._id_lock = threading.Lock()
+        self.batches_written = 0
+        self.ops_written = 0
+        self.ops_dropped = 0
+        self.heartbeats_dropped = 0
+
+    def start(self):
+        """Start the writer thread (call after db.init_db)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._id_counter = itertools.count(db.get_max_session_id() + 1)
+        self._thread = threading.Thread(target=self._run, name="workshot-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Flush pending writes and stop the writer thread."""
+        if not self._thread:
+            return
+        self._put(_STOP)
+        self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def allocate_session_id(self) -> int:
+        """Reserve the next session ID without touching the database."""
+        with self._id_lock:
+            return next(self._id_counter)
+
+    def end_session(self, session_id: int, end_time: datetime):
+        """Queue closing a session row."""
+        self._put(lambda cursor: db.close_session(cursor, session_id, end_time))
+
+    def switch_session(
+        self,
+        old_session_id: Optional[int],
+        session_id: int,
+        app_name: str,
+        window_title: str,
+        monitor: int,
+        at: datetime,
+        is_idle: bool = False,
+        session_label_id: Optional[int] = None
+    ):
+        """Queue an atomic transition: close the old row and insert the new one together."""
+        def op(cursor: sqlite3.Cursor):
+            if old_session_id:
+                db.close_session(cursor, old_session_id, at)
+            db.insert_session(cursor, session_id, app_name, window_title, monitor, at, is_idle, session_label_id)
+        self._put(op)
+
+    def heartbeat(self, session_id: int, at: datetime):
+        """Queue a checkpoint of the open session (coalesced with other pending heartbeats)."""
+        self._put(_Heartbeat(session_id, at))
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Block until everything queued so far has been written. Returns False on timeout."""
+        done = threading.Event()
+        self._put(done)
+        return done.wait(timeout)
+
+    def _put(self, op):
+        """Enqueue without ever blocking the caller, shedding heartbeats when the queue is full."""
+        try:
+            self._queue.put_nowait(op)
+            return
+        except queue.Full:
+            pass
+        with self._queue.mutex:
+            pending = self._queue.queue
+            if isinstance(op, _Heartbeat):
+                self.heartbeats_dropped += 1
+                return
+            kept = [item for item in pending if not isinstance(item, _Heartbeat)]
+            if len(kept) < len(pending):
+                self.heartbeats_dropped += len(pending) - len(kept)
+                pending.clear()
+                pending.extend(kept)
+            elif len(pending) == self._queue.maxsize:
+                print("[!] Session writer queue full, queueing past the limit until the disk catches up...")
+            pending.append(op)
+            self._queue.not_empty.notify()
+
+    def _run(self):
+        """Writer loop: drain pending ops and commit them as one transaction."""
+        stopping = False
+        while not stopping:
+            batch = [self._queue.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            if _STOP in batch:
+                stopping = True
+            waiters = [op for op in batch if isinstance(op, threading.Event)]
+            ops = [op for op in batch if op is not _STOP and not isinstance(op, threading.Event)]
+            ops = self._coalesce_heartbeats(ops)
+
+            if ops:
+                self._write_batch(ops, retry=not stopping)
+            for waiter in waiters:
+                waiter.set()
+
+    @staticmethod
+    def _coalesce_heartbeats(ops: list) -> list:
+        """Keep only the last heartbeat per session; other ops keep their order."""
+        latest = {op.session_id: op for op in ops if isinstance(op, _Heartbeat)}
+        return [op for op in ops if not isinstance(op, _Heartbeat) or latest[op.session_id] is op]
+
+    def _write_batch(self, batch: list[WriteOp], retry: bool = True):
+        """
+        Apply a batch in one transaction.
+
+        Lock errors are retried with exponential backoff, up to max_attempts
+        (3 while stopping). Any other error rolls the batch back and re-applies
+        its ops one by one, so only the op that fails is dropped.
+        """
+        max_attempts = self.max_attempts if retry else 3
+        attempts = 0
+        while True:
+            attempts += 1
+            try:
+                with db.get_db() as conn:
+                    cursor = conn.cursor()
+                    for op in batch:
+                        op(cursor)
+                self.batches_written += 1
+                self.ops_written += len(batch)
+                return
+            except sqlite3.OperationalError as e:
+                if attempts >= max_attempts:
+                    print(f"[!] Session write failed ({e}), giving up on {len(batch)} pending session writes.")
+                    self.ops_dropped += len(batch)
+                    return
+                delay = min(self.retry_delay * 2 ** (attempts - 1), MAX_RETRY_DELAY)
+                print(f"[!] Session write failed ({e}), retrying in {delay:.1f}s...")
+                time.sleep(delay)
+            except Exception as e:
+                if len(batch) == 1:
+                    print(f"[!] Session write dropped: {e}")
+                    self.ops_dropped += 1
+                    return
+                print(f"[!] Session batch failed ({e}), applying its writes one by one...")
+                for op in batch:
+                    self._write_batch([op], retry)
+                return
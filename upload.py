@@ -1,5 +1,15 @@
+import gzip
+import hashlib
+import json
 import os
+import shutil
+import tempfile
+import threading
+from datetime import datetime
+
+import httplib2
 from google.auth.transport.requests import Request
+from google_auth_httplib2 import AuthorizedHttp
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
@@ -9,6 +19,13 @@ from googleapiclient.http import MediaFileUpload
 # Using drive scope to access/create folders in Drive
 SCOPES = ['https://www.googleapis.com/auth/drive']
 
+# Content hashes of files already uploaded, so unchanged reports are skipped
+MANIFEST_FILE = 'upload_manifest.json'
+# Files at least this large are gzipped before upload
+COMPRESS_MIN_BYTES = 1024 * 1024
+# Retries for transient HTTP errors on each Drive request
+NUM_RETRIES = 3
+
 def authenticate():
     """Shows basic usage of the Drive v3 API.
     """
@@ -34,11 +51,11 @@ def authenticate():
 
     return creds
 
-def get_or_create_folder(service, folder_name='WS'):
+def get_or_create_folder(service, folder_name='WS', http=None):
     """Get the folder ID for the specified folder, or create it if it doesn't exist."""
     # Search for the folder
     query = f"name='{folder_name}' and mimeType='application/vnd.google-apps.folder' and trashed=false"
-    results = service.files().list(q=query, spaces='drive', fields='files(id, name)').execute()
+    results = service.files().list(q=query, spaces='drive', fields='files(id, name)').execute(http=http, num_retries=NUM_RETRIES)
     items = results.get('files', [])
     
     if items:
@@ -52,36 +69,144 @@ def get_or_create_folder(service, folder_name='WS'):
             'name': folder_name,
             'mimeType': 'application/vnd.google-apps.folder'
         }
-        folder = service.files().create(body=file_metadata, fields='id').execute()
+        folder = service.files().create(body=file_metadata, fields='id').execute(http=http, num_retries=NUM_RETRIES)
         print(f"[+] Folder created with ID: {folder.get('id')}")
         return folder.get('id')
 
-def upload_file(file_path, folder_name='WS'):
-    creds = authenticate()
-    service = build('drive', 'v3', credentials=creds)
+def file_sha256(file_path):
+    """Hex SHA-256 of a file's contents, read in chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
 
-    file_name = os.path.basename(file_path)
-    
-    # Get or create the folder
-    folder_id = get_or_create_folder(service, folder_name)
+class DriveClient:
+    """
+    Long-lived Drive connection for repeated uploads.
 
-    file_metadata = {
-        'name': file_name,
-        'parents': [folder_id]  # Upload to the specified folder
-    }
-    
-    # You can specify mimetype if you know it, e.g., 'image/jpeg' or 'application/pdf'
-    media = MediaFileUpload(file_path, resumable=True)
+    Credentials, the built service and resolved folder IDs are kept for the
+    life of the process instead of being re-read and re-queried per upload.
+    Each request runs on its own AuthorizedHttp, since httplib2 connections
+    are not thread-safe and the upload queue runs uploads concurrently.
+    A manifest of content hashes per folder lets unchanged files be skipped.
+    """
 
-    print(f"Uploading {file_name} to folder '{folder_name}'...")
-    
-    file = service.files().create(
-        body=file_metadata,
-        media_body=media,
-        fields='id'
-    ).execute()
+    def __init__(self, manifest_file=MANIFEST_FILE):
+        self.manifest_file = manifest_file
+        self._creds = None
+        self._service = None
+        self._folders = {}
+        self._manifest = None
+        self._lock = threading.RLock()
+
+    def credentials(self):
+        """Cached credentials, refreshed (or re-authorized) when no longer valid."""
+        with self._lock:
+            if self._creds is None or not self._creds.valid:
+                self._creds = authenticate()
+            return self._creds
+
+    def _http(self):
+        return AuthorizedHttp(self.credentials(), http=httplib2.Http())
+
+    def service(self):
+        with self._lock:
+            if self._service is None:
+                self._service = build('drive', 'v3', credentials=self.credentials(), cache_discovery=False)
+            return self._service
+
+    def folder_id(self, folder_name='WS'):
+        """Drive ID of a folder, looked up (or created) once per process."""
+        with self._lock:
+            if folder_name not in self._folders:
+                self._folders[folder_name] = get_or_create_folder(self.service(), folder_name, http=self._http())
+            return self._folders[folder_name]
 
-    print(f"File ID: {file.get('id')} uploaded successfully to '{folder_name}' folder.")
+    def _load_manifest(self):
+        if self._manifest is None:
+            try:
+                with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                    self._manifest = json.load(f)
+            except (OSError, ValueError):
+                self._manifest = {}
+        return self._manifest
+
+    def already_uploaded(self, sha256, folder_name='WS'):
+        """Manifest entry for content already uploaded to this folder, if any."""
+        with self._lock:
+            return self._load_manifest().get(f"{folder_name}:{sha256}")
+
+    def _record(self, sha256, folder_name, entry):
+        with self._lock:
+            manifest = self._load_manifest()
+            manifest[f"{folder_name}:{sha256}"] = entry
+            tmp = f"{self.manifest_file}.tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2)
+            os.replace(tmp, self.manifest_file)
+
+    def upload(self, file_path, folder_name='WS'):
+        """
+        Upload a file unless identical content is already in the folder.
+        Files of COMPRESS_MIN_BYTES or more are sent gzipped as <name>.gz.
+        Returns the Drive file ID (of the earlier upload when skipped).
+        """
+        file_name = os.path.basename(file_path)
+        sha256 = file_sha256(file_path)
+        existing = self.already_uploaded(sha256, folder_name)
+        if existing:
+            print(f"[=] {file_name} unchanged since {existing['uploaded_at']}, skipping upload.")
+            return existing['file_id']
+
+        folder_id = self.folder_id(folder_name)
+        upload_path, mimetype, tmp_dir = file_path, None, None
+        try:
+            if os.path.getsize(file_path) >= COMPRESS_MIN_BYTES:
+                tmp_dir = tempfile.mkdtemp(prefix='workshot-upload-')
+                upload_path = os.path.join(tmp_dir, f"{file_name}.gz")
+                with open(file_path, 'rb') as src, gzip.open(upload_path, 'wb') as dst:
+                    shutil.copyfileobj(src, dst)
+                mimetype = 'application/gzip'
+
+            file_metadata = {
+                'name': os.path.basename(upload_path),
+                'parents': [folder_id]  # Upload to the specified folder
+            }
+            media = MediaFileUpload(upload_path, mimetype=mimetype, resumable=True)
+
+            print(f"Uploading {file_metadata['name']} to folder '{folder_name}'...")
+            file = self.service().files().create(
+                body=file_metadata,
+                media_body=media,
+                fields='id'
+            ).execute(http=self._http(), num_retries=NUM_RETRIES)
+        finally:
+            if tmp_dir:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        self._record(sha256, folder_name, {
+            'name': file_metadata['name'],
+            'file_id': file.get('id'),
+            'uploaded_at': datetime.now().isoformat(timespec='seconds'),
+        })
+        print(f"File ID: {file.get('id')} uploaded successfully to '{folder_name}' folder.")
+        return file.get('id')
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_drive_client():
+    """Get or create the process-wide Drive client."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = DriveClient()
+        return _client
+
+def upload_file(file_path, folder_name='WS'):
+    """Upload a file to a Drive folder through the shared client (skipped if unchanged)."""
+    return get_drive_client().upload(file_path, folder_name)
 
 if __name__ == '__main__':
     # REPLACE THIS with the path to the file you want to upload
@@ -1,7 +1,23 @@
 @echo off
 REM WorkShot Global Launcher Script
 REM Copy this file to C:\Users\YOUR_USERNAME\bin\ and add that directory to PATH
+REM   workshot                       Restart the tracker and dashboard
+REM   workshot track --headless      Restart the tracker without the dashboard
+REM   workshot stats --range week    stats and export run alongside the tracker
+REM   workshot compact               compact and rebuild-rollups refuse to run until the tracker is stopped
 
+REM Navigate to WorkShot directory (UPDATE THIS PATH TO YOUR INSTALLATION)
+cd /d "C:\Users\YOUR_USERNAME\WorkShot\WorkShot"
+
+REM Subcommands never stop the tracker; maintenance ones (compact, rebuild-rollups) exit with an error while it runs
+set "WS_COMMAND=%~1"
+if "%WS_COMMAND%"=="" goto start_tracker
+if "%WS_COMMAND:~0,1%"=="-" goto start_tracker
+if /I "%WS_COMMAND%"=="track" goto start_tracker
+python main.py %*
+exit /b %ERRORLEVEL%
+
+:start_tracker
 echo [*] Checking for running WorkShot instances...
 
 REM Stop all Python processes that are running WorkShot
@@ -10,14 +26,11 @@ powershell -Command "Get-Process python -ErrorAction SilentlyContinue | Where-Ob
 REM Wait a moment for processes to fully terminate
 timeout /t 2 /nobreak >nul 2>&1
 
-REM Navigate to WorkShot directory (UPDATE THIS PATH TO YOUR INSTALLATION)
-cd /d "C:\Users\YOUR_USERNAME\WorkShot\WorkShot"
-
 echo [+] Starting WorkShot...
 echo.
 
 REM Run Python directly
-python main.py
+python main.py %*
 
 REM Exit cleanly
 exit /b